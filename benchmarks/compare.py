@@ -0,0 +1,53 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def load(path: Path) -> dict[str, dict]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+
+    return {scenario["name"]: scenario for scenario in data["scenarios"]}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark result files."
+    )
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="p95 regression (in percent) that fails the comparison",
+    )
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    regressions = []
+
+    print(f"{'scenario':<32}" + "".join(f"{m:>22}" for m in METRICS))
+    for name in sorted(baseline.keys() & candidate.keys()):
+        cells = []
+        for metric in METRICS:
+            before, after = baseline[name][metric], candidate[name][metric]
+            change = (after - before) / before * 100 if before else 0.0
+            cells.append(f"{after:10.2f} ({change:+7.1f}%)")
+
+            if metric == "p95_ms" and change > args.threshold:
+                regressions.append(name)
+
+        print(f"{name:<32}" + "".join(f"{cell:>22}" for cell in cells))
+
+    if regressions:
+        print(f"\np95 regressions above {args.threshold}%: {regressions}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+
+from benchmarks.harness import write_results
+from src.app.app import app
+from src.app.database.connection import get_read_session, get_session
+from src.app.dependencies.dependencies import (
+    get_auth_service,
+    get_user_repository,
+    get_user_service,
+)
+from src.app.models.user import User
+from src.app.repositories.user_repository import UserRepository
+from src.app.routers import auth
+from src.app.security.rate_limit import (
+    InMemoryRateLimitBackend,
+    LoginRateLimiter,
+)
+from src.app.security.security import (
+    get_password_hash,
+    token_cache,
+    user_cache,
+)
+from src.app.services.auth_service import AuthService
+from src.app.services.user_service import UserService
+from tests.conftest import engine, session  # noqa: F401
+
+BENCH_USERS = int(os.getenv("BENCH_USERS", "5000"))
+BENCH_ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "200"))
+BENCH_CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "1"))
+BENCH_OUTPUT = Path(
+    os.getenv("BENCH_OUTPUT", Path(__file__).parent / "results")
+)
+BENCH_PASSWORD = "benchmark"
+
+_results: list[dict] = []
+
+
+def pytest_sessionfinish():
+    if _results:
+        path = write_results(_results, BENCH_OUTPUT)
+        print(f"\nbenchmark results written to {path}")
+
+
+@pytest.fixture
+def record_result():
+    def _record_result(result):
+        summary = result.summary()
+        _results.append(summary)
+
+        print(
+            f"\n{summary['name']:<32} {summary['throughput_rps']:9.1f} req/s"
+            f"  p50 {summary['p50_ms']:7.2f} ms"
+            f"  p95 {summary['p95_ms']:7.2f} ms"
+            f"  p99 {summary['p99_ms']:7.2f} ms"
+        )
+
+        return summary
+
+    return _record_result
+
+
+@pytest_asyncio.fixture
+async def seeded_users(session):  # noqa: F811
+    password = get_password_hash(BENCH_PASSWORD)
+
+    await session.execute(
+        insert(User),
+        [
+            {
+                "username": f"bench{index}",
+                "email": f"bench{index}@bench.com",
+                "password": password,
+            }
+            for index in range(BENCH_USERS)
+        ],
+    )
+    await session.commit()
+
+    return BENCH_USERS
+
+
+@pytest_asyncio.fixture
+async def async_client(session, monkeypatch):  # noqa: F811
+    def get_session_override():
+        return session
+
+    def get_user_repository_override():
+        return UserRepository(session)
+
+    def get_auth_service_override():
+        return AuthService(UserRepository(session))
+
+    def get_user_service_override():
+        return UserService(UserRepository(session))
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    app.dependency_overrides[get_user_repository] = (
+        get_user_repository_override
+    )
+    app.dependency_overrides[get_auth_service] = get_auth_service_override
+    app.dependency_overrides[get_user_service] = get_user_service_override
+    user_cache.clear()
+    token_cache.clear()
+
+    # Every request comes from the same client address, so the login
+    # limiter keeps its code path but with limits the run cannot reach.
+    monkeypatch.setattr(
+        auth,
+        "login_rate_limiter",
+        LoginRateLimiter(
+            InMemoryRateLimitBackend(),
+            ip_limit=(10**9, 10**9),
+            account_limit=(10**9, 10**9),
+            max_concurrent=10**9,
+        ),
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def auth_headers(async_client, seeded_users):
+    response = await async_client.post(
+        "/auth/login",
+        data={"username": "bench0@bench.com", "password": BENCH_PASSWORD},
+    )
+
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+
+def percentile(sorted_values: list[float], rank: float) -> float:
+    if not sorted_values:
+        return 0.0
+
+    index = max(math.ceil(rank / 100 * len(sorted_values)) - 1, 0)
+
+    return sorted_values[index]
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    concurrency: int
+    total_seconds: float
+    latencies: list[float] = field(repr=False)
+    errors: int = 0
+
+    def summary(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        return {
+            "name": self.name,
+            "requests": count,
+            "errors": self.errors,
+            "concurrency": self.concurrency,
+            "throughput_rps": count / self.total_seconds,
+            "mean_ms": sum(latencies) / count * 1000 if count else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": latencies[-1] * 1000 if count else 0.0,
+        }
+
+
+async def run_scenario(
+    name: str,
+    request: Callable[[int], Awaitable[Any]],
+    *,
+    iterations: int,
+    concurrency: int = 1,
+    expected_status: int | None = None,
+) -> BenchmarkResult:
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+
+        while next_index < iterations:
+            index = next_index
+            next_index += 1
+
+            started_at = time.perf_counter()
+            response = await request(index)
+            latencies.append(time.perf_counter() - started_at)
+
+            status = getattr(response, "status_code", None)
+            if expected_status is not None and status != expected_status:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return BenchmarkResult(
+        name=name,
+        concurrency=concurrency,
+        total_seconds=time.perf_counter() - started_at,
+        latencies=latencies,
+        errors=errors,
+    )
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(results: list[dict[str, Any]], output_dir: Path) -> Path:
+    revision = _git_revision()
+    created_at = datetime.now(tz=timezone.utc)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / (
+        f"{created_at:%Y%m%dT%H%M%S}-{revision or 'unknown'}.json"
+    )
+    path.write_text(
+        json.dumps(
+            {
+                "revision": revision,
+                "created_at": created_at.isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scenarios": results,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+    return path
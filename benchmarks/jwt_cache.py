@@ -0,0 +1,37 @@
+import time
+
+from src.app.security.security import (
+    create_access_token,
+    decode_access_token,
+    token_cache,
+)
+
+ROUNDS = 20_000
+
+
+def cpu_seconds_per_call(func, *args, rounds: int = ROUNDS) -> float:
+    started_at = time.process_time()
+    for _ in range(rounds):
+        func(*args)
+
+    return (time.process_time() - started_at) / rounds
+
+
+def main():
+    token = create_access_token({"sub": "bench@test.com"})
+
+    def decode_uncached(token):
+        token_cache.invalidate(token)
+        decode_access_token(token)
+
+    uncached = cpu_seconds_per_call(decode_uncached, token)
+    decode_access_token(token)
+    cached = cpu_seconds_per_call(decode_access_token, token)
+
+    print(f"jwt decode (verify):  {uncached * 1e6:8.2f} us/request")
+    print(f"jwt decode (cached):  {cached * 1e6:8.2f} us/request")
+    print(f"cpu saved:            {(uncached - cached) * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
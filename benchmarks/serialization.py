@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.app.models.user import Base, User
+from src.app.responses.responses import FastJSONResponse
+from src.app.schemas.schemas import UserList
+from src.app.services.user_service import UserService
+
+PAGE_SIZE = 1000
+ROUNDS = 200
+
+
+def cpu_seconds_per_call(func, *args, rounds: int = ROUNDS) -> float:
+    started_at = time.process_time()
+    for _ in range(rounds):
+        func(*args)
+
+    return (time.process_time() - started_at) / rounds
+
+
+def serialize_models(users):
+    content = UserList.model_validate({"users": users}).model_dump(
+        mode="json", exclude_none=True
+    )
+
+    return JSONResponse(content).body
+
+
+def serialize_rows(rows):
+    return FastJSONResponse({"users": UserService.to_public(rows)}).body
+
+
+async def load_page():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "username": f"bench{index}",
+                    "email": f"bench{index}@bench.com",
+                    "password": "x",
+                }
+                for index in range(PAGE_SIZE)
+            ],
+        )
+
+    async with AsyncSession(engine) as session:
+        users = (await session.scalars(select(User))).all()
+        rows = (
+            await session.execute(
+                select(
+                    *(getattr(User, name) for name in UserService.LIST_COLUMNS)
+                )
+            )
+        ).all()
+
+    await engine.dispose()
+
+    return users, rows
+
+
+def main():
+    users, rows = asyncio.run(load_page())
+    assert serialize_models(users) == serialize_rows(rows)
+
+    models = cpu_seconds_per_call(serialize_models, users)
+    fast = cpu_seconds_per_call(serialize_rows, rows)
+
+    print(f"page of {PAGE_SIZE} users")
+    print(f"response_model + json:   {models * 1e3:8.3f} ms/page")
+    print(f"rows + fast json:        {fast * 1e3:8.3f} ms/page")
+    print(f"speedup:                 {models / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
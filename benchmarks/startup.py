@@ -0,0 +1,72 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "2000"))
+TOP_IMPORTS = 15
+
+
+def import_profile() -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app.app"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    profile = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line.removeprefix("import time:").split(
+            "|"
+        )
+        profile.append((int(self_us), int(cumulative_us), name.strip()))
+
+    return profile
+
+
+async def run_lifespan(app) -> tuple[float, float]:
+    started_at = time.perf_counter()
+
+    async with app.router.lifespan_context(app):
+        ready_at = time.perf_counter()
+
+    return ready_at - started_at, time.perf_counter() - ready_at
+
+
+def main() -> int:
+    profile = import_profile()
+
+    started_at = time.perf_counter()
+    from src.app.app import app  # noqa: PLC0415
+
+    import_seconds = time.perf_counter() - started_at
+    warm_up_seconds, shutdown_seconds = asyncio.run(run_lifespan(app))
+    total_ms = (import_seconds + warm_up_seconds) * 1000
+
+    print(f"slowest imports (self time, top {TOP_IMPORTS}):")
+    for self_us, cumulative_us, name in sorted(profile, reverse=True)[
+        :TOP_IMPORTS
+    ]:
+        print(
+            f"  {self_us / 1000:8.2f} ms  "
+            f"(cumulative {cumulative_us / 1000:8.2f} ms)  {name}"
+        )
+
+    print()
+    print(f"import:          {import_seconds * 1000:8.2f} ms")
+    print(f"lifespan warmup: {warm_up_seconds * 1000:8.2f} ms")
+    print(f"shutdown:        {shutdown_seconds * 1000:8.2f} ms")
+    print(
+        f"startup total:   {total_ms:8.2f} ms (budget {STARTUP_BUDGET_MS} ms)"
+    )
+
+    return 0 if total_ms <= STARTUP_BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+
+from benchmarks.conftest import (
+    BENCH_CONCURRENCY,
+    BENCH_ITERATIONS,
+    BENCH_PASSWORD,
+)
+from benchmarks.harness import run_scenario
+
+LOGIN_ITERATIONS = max(BENCH_ITERATIONS // 10, 5)
+
+
+@pytest.mark.asyncio
+async def test_login(async_client, seeded_users, record_result):
+    async def request(index):
+        return await async_client.post(
+            "/auth/login",
+            data={
+                "username": f"bench{index % seeded_users}@bench.com",
+                "password": BENCH_PASSWORD,
+            },
+        )
+
+    result = await run_scenario(
+        "login",
+        request,
+        iterations=LOGIN_ITERATIONS,
+        concurrency=BENCH_CONCURRENCY,
+        expected_status=HTTPStatus.OK,
+    )
+
+    assert record_result(result)["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_create_user(async_client, record_result):
+    async def request(index):
+        return await async_client.post(
+            "/users/",
+            json={
+                "username": f"created{index}",
+                "email": f"created{index}@bench.com",
+                "password": BENCH_PASSWORD,
+            },
+        )
+
+    result = await run_scenario(
+        "create_user",
+        request,
+        iterations=LOGIN_ITERATIONS,
+        concurrency=BENCH_CONCURRENCY,
+        expected_status=HTTPStatus.CREATED,
+    )
+
+    assert record_result(result)["errors"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("depth", ["start", "middle", "end"])
+async def test_list_users_offset(
+    async_client, seeded_users, auth_headers, record_result, depth
+):
+    offset = {"start": 0, "middle": seeded_users // 2, "end": seeded_users}
+    params = {"offset": max(offset[depth] - 100, 0), "limit": 100}
+
+    async def request(index):
+        return await async_client.get(
+            "/users/", headers=auth_headers, params=params
+        )
+
+    result = await run_scenario(
+        f"list_users_offset_{depth}",
+        request,
+        iterations=BENCH_ITERATIONS,
+        concurrency=BENCH_CONCURRENCY,
+        expected_status=HTTPStatus.OK,
+    )
+
+    assert record_result(result)["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_list_users_large_page(
+    async_client, seeded_users, auth_headers, record_result
+):
+    params = {"limit": 1000}
+
+    async def request(index):
+        return await async_client.get(
+            "/users/", headers=auth_headers, params=params
+        )
+
+    result = await run_scenario(
+        "list_users_page_1000",
+        request,
+        iterations=max(BENCH_ITERATIONS // 4, 5),
+        concurrency=BENCH_CONCURRENCY,
+        expected_status=HTTPStatus.OK,
+    )
+
+    assert record_result(result)["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_user_by_id(
+    async_client, seeded_users, auth_headers, record_result
+):
+    async def request(index):
+        return await async_client.get(
+            f"/users/{index % seeded_users + 1}", headers=auth_headers
+        )
+
+    result = await run_scenario(
+        "get_user_by_id",
+        request,
+        iterations=BENCH_ITERATIONS,
+        concurrency=BENCH_CONCURRENCY,
+        expected_status=HTTPStatus.OK,
+    )
+
+    assert record_result(result)["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_current_user(async_client, auth_headers, record_result):
+    async def request(index):
+        return await async_client.post(
+            "/auth/refresh_token", headers=auth_headers
+        )
+
+    result = await run_scenario(
+        "get_current_user",
+        request,
+        iterations=BENCH_ITERATIONS,
+        concurrency=BENCH_CONCURRENCY,
+        expected_status=HTTPStatus.OK,
+    )
+
+    assert record_result(result)["errors"] == 0
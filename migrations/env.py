@@ -4,16 +4,17 @@ from logging.config import fileConfig
 
 from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.engine import make_url
 
 from alembic import context
 
 from src.app.models.user import Base
-from src.app.settings.settings import Settings
+from src.app.settings.settings import get_settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", Settings().DATABASE_URL)
+config.set_main_option("sqlalchemy.url", get_settings().DATABASE_URL)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -26,6 +27,35 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Search support lives outside the models: SQLite keeps an FTS5 table
+# (plus its shadow tables) maintained by triggers, and the trigram GIN
+# indexes only exist on Postgres. Keep autogenerate from diffing them.
+SQLITE_SEARCH_TABLE = "users_search"
+POSTGRESQL_ONLY_INDEXES = {"ix_users_username_trgm", "ix_users_email_trgm"}
+
+
+def include_object_for(dialect_name):
+    def include_object(object, name, type_, reflected, compare_to):
+        if (
+            type_ == "table"
+            and reflected
+            and compare_to is None
+            and name.startswith(SQLITE_SEARCH_TABLE)
+        ):
+            return False
+
+        if (
+            type_ == "index"
+            and dialect_name != "postgresql"
+            and name in POSTGRESQL_ONLY_INDEXES
+        ):
+            return False
+
+        return True
+
+    return include_object
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +78,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object_for(make_url(url).get_backend_name()),
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -71,7 +102,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object_for(connection.dialect.name),
         )
 
         with context.begin_transaction():
@@ -79,7 +112,11 @@ def run_migrations_online() -> None:
 
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object_for(connection.dialect.name),
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,30 @@
+"""add lower email index to users
+
+Revision ID: 8c4e6f1a2d37
+Revises: 3f1c2a7d9b04
+Create Date: 2026-10-18 10:03:27.581240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e6f1a2d37'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a7d9b04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails if the table already holds emails that differ only by case;
+    # those rows have to be merged before upgrading.
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_lower', table_name='users')
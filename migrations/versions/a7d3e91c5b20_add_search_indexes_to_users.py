@@ -0,0 +1,64 @@
+"""add search indexes to users
+
+Revision ID: a7d3e91c5b20
+Revises: 8c4e6f1a2d37
+Create Date: 2026-10-18 14:21:09.318474
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e91c5b20'
+down_revision: Union[str, Sequence[str], None] = '8c4e6f1a2d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE users_search USING fts5("
+    "username, email, content='users', content_rowid='id', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER users_search_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_search(rowid, username, email) "
+    "VALUES (new.id, new.username, new.email); END",
+    "CREATE TRIGGER users_search_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); END",
+    "CREATE TRIGGER users_search_au AFTER UPDATE OF username, email "
+    "ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); "
+    "INSERT INTO users_search(rowid, username, email) "
+    "VALUES (new.id, new.username, new.email); END",
+    "INSERT INTO users_search(users_search) VALUES ('rebuild')",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_users_username_trgm', 'users', ['username'], unique=False, postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+        op.create_index('ix_users_email_trgm', 'users', ['email'], unique=False, postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+    elif dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(sa.text(statement))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_users_email_trgm', table_name='users', postgresql_using='gin')
+        op.drop_index('ix_users_username_trgm', table_name='users', postgresql_using='gin')
+    elif dialect == 'sqlite':
+        for trigger in ('users_search_ai', 'users_search_ad', 'users_search_au'):
+            op.execute(sa.text(f'DROP TRIGGER IF EXISTS {trigger}'))
+        op.execute(sa.text('DROP TABLE IF EXISTS users_search'))
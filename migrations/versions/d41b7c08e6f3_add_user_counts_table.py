@@ -0,0 +1,75 @@
+"""add user counts table
+
+Revision ID: d41b7c08e6f3
+Revises: a7d3e91c5b20
+Create Date: 2026-10-18 16:47:52.904118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b7c08e6f3'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e91c5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_COUNTER_DDL = (
+    "CREATE TRIGGER user_counts_ai AFTER INSERT ON users BEGIN "
+    "UPDATE user_counts SET total = total + 1 WHERE id = 1; END",
+    "CREATE TRIGGER user_counts_ad AFTER DELETE ON users BEGIN "
+    "UPDATE user_counts SET total = total - 1 WHERE id = 1; END",
+)
+POSTGRESQL_COUNTER_DDL = (
+    "CREATE OR REPLACE FUNCTION user_counts_refresh() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    "IF TG_OP = 'INSERT' THEN "
+    "UPDATE user_counts SET total = total + "
+    "(SELECT count(*) FROM changed_rows) WHERE id = 1; "
+    "ELSE "
+    "UPDATE user_counts SET total = total - "
+    "(SELECT count(*) FROM changed_rows) WHERE id = 1; "
+    "END IF; RETURN NULL; END $$",
+    "CREATE TRIGGER user_counts_ai AFTER INSERT ON users "
+    "REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT "
+    "EXECUTE FUNCTION user_counts_refresh()",
+    "CREATE TRIGGER user_counts_ad AFTER DELETE ON users "
+    "REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT "
+    "EXECUTE FUNCTION user_counts_refresh()",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_counts',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Seeding and installing the triggers under a table lock keeps
+    # concurrent inserts from slipping between the two.
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('LOCK TABLE users IN SHARE ROW EXCLUSIVE MODE')
+    op.execute('INSERT INTO user_counts (id, total) SELECT 1, count(*) FROM users')
+
+    statements = POSTGRESQL_COUNTER_DDL if dialect == 'postgresql' else SQLITE_COUNTER_DDL
+    for statement in statements:
+        op.execute(sa.text(statement))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    suffix = ' ON users' if dialect == 'postgresql' else ''
+
+    for trigger in ('user_counts_ai', 'user_counts_ad'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}{suffix}')
+    if dialect == 'postgresql':
+        op.execute('DROP FUNCTION IF EXISTS user_counts_refresh()')
+    op.drop_table('user_counts')
@@ -1,17 +1,97 @@
-from fastapi import FastAPI
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.database.connection import db_handler
+from src.app.database.database import DBConnectionHandler
+from src.app.metrics.metrics import registry
+from src.app.metrics.middleware import MetricsMiddleware
+from src.app.profiling.middleware import ProfilingMiddleware
+from src.app.profiling.profiler import profile_store
+from src.app.repositories.user_repository import UserRepository
+from src.app.responses.responses import FastJSONResponse
+from src.app.routers import auth, internal, users
+from src.app.security.security import (
+    calibrate_password_hashing,
+    hashing_pool,
+    verify_internal_token,
+)
+from src.app.services.user_service import UserService
+from src.app.settings.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up(handler: DBConnectionHandler, connections: int):
+    await handler.warm_up(connections)
+
+    # Compiled statements are cached per engine, so replicas that serve
+    # most reads are primed as well.
+    for engine in (handler.get_engine(), *handler.get_replica_engines()):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await UserService(UserRepository(session)).warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started_at = time.perf_counter()
+
+    try:
+        calibration = await calibrate_password_hashing()
+        if calibration:
+            logger.info(
+                json.dumps({"event": "argon2_calibrated", **calibration})
+            )
+    except Exception as error:
+        logger.warning(
+            json.dumps({
+                "event": "argon2_calibration_failed",
+                "error": repr(error),
+            })
+        )
+
+    connections = get_settings().DATABASE_WARMUP_CONNECTIONS
+    try:
+        if connections > 0:
+            await warm_up(db_handler, connections)
+    except Exception as error:
+        logger.warning(
+            json.dumps({"event": "warm_up_failed", "error": repr(error)})
+        )
+
+    logger.info(
+        json.dumps({
+            "event": "startup",
+            "warm_up_ms": (time.perf_counter() - started_at) * 1000,
+        })
+    )
+
+    yield
+
+    hashing_pool.shutdown(wait=False)
+    await db_handler.dispose()
 
-from src.app.routers import auth, users
 
 app = FastAPI(
     title="User Management API",
     description="User management with JWT",
     version="1.0.0",
     contact={"name": "Raniere", "email": "chownrani@proton.me"},
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
+app.add_middleware(ProfilingMiddleware, store=profile_store)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(internal.router)
 
 
 @app.get("/", tags=["root"])
@@ -26,3 +106,15 @@ async def root():
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get(
+    "/metrics",
+    tags=["metrics"],
+    response_class=PlainTextResponse,
+    dependencies=[Depends(verify_internal_token)],
+)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -1,3 +1,33 @@
+from typing import Annotated, AsyncGenerator
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from src.app.database.database import DBConnectionHandler
+from src.app.metrics.metrics import StatsGauges, registry
 
 db_handler = DBConnectionHandler()
+
+registry.register(
+    StatsGauges("db_pool", "Database connection pool", db_handler.pool_status)
+)
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    async for session in db_handler.get_session():
+        yield session
+
+
+async def get_read_session(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> AsyncGenerator[AsyncSession, None]:
+    if (
+        not db_handler.has_replicas()
+        or request.headers.get("X-Consistency") == "strong"
+    ):
+        yield session
+        return
+
+    async for read_session in db_handler.get_read_session():
+        yield read_session
@@ -1,22 +1,167 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import itertools
+import time
+from typing import Any
 
-from src.app.settings.settings import Settings
+from sqlalchemy import event, exc
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+
+from src.app.database.pool import InstrumentedAsyncQueuePool, PoolTelemetry
+from src.app.metrics.metrics import instrument_engine
+from src.app.settings.settings import Settings, get_settings
+
+
+def is_connection_error(error: BaseException | None) -> bool:
+    # Errors raised while connecting carry no statement; ordinary SQL
+    # errors (lock timeouts, missing tables) leave the connection usable.
+    return isinstance(error, exc.DBAPIError) and (
+        error.connection_invalidated or error.statement is None
+    )
 
 
 class DBConnectionHandler:
-    def __init__(self):
-        self.__connection_string = Settings().DATABASE_URL
-        self.__engine = self.__create_engine()
+    def __init__(self, settings: Settings | None = None):
+        self.__settings = settings or get_settings()
+        self.__connection_string = self.__settings.DATABASE_URL
+        self.__engine = self.__create_engine(self.__connection_string)
+
+        self.__replica_engines = [
+            self.__create_engine(replica_url)
+            for replica_url in self.__settings.DATABASE_REPLICA_URLS
+        ]
+        self.__replica_cycle = itertools.cycle(
+            range(len(self.__replica_engines))
+        )
+        self.__unhealthy_until: dict[int, float] = {}
+
+        for index, engine in enumerate(self.__replica_engines):
+            event.listen(
+                engine.sync_engine,
+                "handle_error",
+                self.__replica_error_listener(index),
+            )
 
     def get_engine(self):
         return self.__engine
 
-    def __create_engine(self):
-        engine = create_async_engine(self.__connection_string)
+    def get_replica_engines(self) -> list[AsyncEngine]:
+        return list(self.__replica_engines)
+
+    def has_replicas(self) -> bool:
+        return bool(self.__replica_engines)
+
+    def get_read_engine(self) -> AsyncEngine:
+        now = time.monotonic()
+
+        for _ in range(len(self.__replica_engines)):
+            index = next(self.__replica_cycle)
+
+            if self.__unhealthy_until.get(index, 0) <= now:
+                return self.__replica_engines[index]
+
+        return self.__engine
+
+    def mark_replica_unhealthy(self, index: int):
+        self.__unhealthy_until[index] = (
+            time.monotonic() + self.__settings.DATABASE_REPLICA_RETRY_SECONDS
+        )
+
+    def __replica_error_listener(self, index: int):
+        def listener(context):
+            if context.is_disconnect or is_connection_error(
+                context.sqlalchemy_exception
+            ):
+                self.mark_replica_unhealthy(index)
+
+        return listener
+
+    def __create_engine(self, connection_string: str):
+        url = make_url(connection_string)
+        engine = create_async_engine(url, **self.__engine_options(url))
+        instrument_engine(engine)
+
+        telemetry = getattr(engine.pool, "telemetry", None)
+        if telemetry is not None:
+            telemetry.slow_checkout_seconds = (
+                self.__settings.DATABASE_POOL_SLOW_CHECKOUT_MS / 1000
+            )
+
         return engine
 
+    def __engine_options(self, url: URL) -> dict[str, Any]:
+        if url.get_backend_name() == "sqlite":
+            return {}
+
+        options = {
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_size": self.__settings.DATABASE_POOL_SIZE,
+            "max_overflow": self.__settings.DATABASE_MAX_OVERFLOW,
+            "pool_timeout": self.__settings.DATABASE_POOL_TIMEOUT,
+            "pool_recycle": self.__settings.DATABASE_POOL_RECYCLE,
+            "pool_pre_ping": self.__settings.DATABASE_POOL_PRE_PING,
+        }
+
+        if url.get_driver_name() == "psycopg":
+            options["connect_args"] = {
+                "prepare_threshold": self.__settings.DATABASE_PREPARE_THRESHOLD
+            }
+
+        return options
+
+    @staticmethod
+    def __pool_snapshot(engine: AsyncEngine) -> dict[str, Any]:
+        pool = engine.pool
+        telemetry = getattr(pool, "telemetry", None) or PoolTelemetry()
+
+        return telemetry.snapshot(pool)
+
+    def pool_status(self) -> dict[str, Any]:
+        status = self.__pool_snapshot(self.__engine)
+
+        if self.__replica_engines:
+            now = time.monotonic()
+            status["replicas"] = [
+                {
+                    **self.__pool_snapshot(engine),
+                    "healthy": self.__unhealthy_until.get(index, 0) <= now,
+                }
+                for index, engine in enumerate(self.__replica_engines)
+            ]
+
+        return status
+
+    async def warm_up(self, connections: int):
+        for engine in (self.__engine, *self.__replica_engines):
+            pending = [engine.connect() for _ in range(connections)]
+
+            try:
+                await asyncio.gather(*(conn.start() for conn in pending))
+            finally:
+                await asyncio.gather(
+                    *(
+                        conn.close()
+                        for conn in pending
+                        if conn.sync_connection is not None
+                    )
+                )
+
+    async def dispose(self):
+        for engine in (self.__engine, *self.__replica_engines):
+            await engine.dispose()
+
     async def get_session(self):
         async with AsyncSession(
             self.__engine, expire_on_commit=False
         ) as session:
             yield session
+
+    async def get_read_session(self):
+        async with AsyncSession(
+            self.get_read_engine(), expire_on_commit=False
+        ) as session:
+            yield session
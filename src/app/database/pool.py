@@ -0,0 +1,92 @@
+import json
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTelemetry:
+    def __init__(self, *, slow_checkout_seconds: float = 0.1):
+        self.slow_checkout_seconds = slow_checkout_seconds
+
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, pool: Pool, wait: float):
+        self.checkouts += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+        if wait >= self.slow_checkout_seconds:
+            self.slow_checkouts += 1
+            self.log("db_pool_slow_checkout", pool, wait_ms=wait * 1000)
+
+    def record_timeout(self, pool: Pool, wait: float):
+        self.timeouts += 1
+        self.log("db_pool_timeout", pool, wait_ms=wait * 1000)
+
+    def log(self, event: str, pool: Pool, **fields):
+        logger.warning(
+            json.dumps({"event": event, **fields, **self.snapshot(pool)})
+        )
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        status = {"pool_class": type(pool).__name__}
+
+        if isinstance(pool, QueuePool):
+            status.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                timeout_seconds=pool.timeout(),
+            )
+
+        avg_wait = (
+            self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+        )
+
+        return {
+            **status,
+            "checkouts": self.checkouts,
+            "slow_checkouts": self.slow_checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_avg": avg_wait,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    telemetry: PoolTelemetry
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def connect(self):
+        started_at = time.perf_counter()
+
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.telemetry.record_timeout(
+                self, time.perf_counter() - started_at
+            )
+            raise
+
+        self.telemetry.record_checkout(self, time.perf_counter() - started_at)
+
+        return connection
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+
+        return pool
@@ -1,23 +1,19 @@
-from typing import Annotated, AsyncGenerator
+from typing import Annotated
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.app.database.connection import db_handler
+from src.app.database.connection import get_read_session, get_session
 from src.app.repositories.user_repository import UserRepository
 from src.app.services.auth_service import AuthService
 from src.app.services.user_service import UserService
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async for session in db_handler.get_session():
-        yield session
-
-
 def get_user_repository(
     session: Annotated[AsyncSession, Depends(get_session)],
+    read_session: Annotated[AsyncSession, Depends(get_read_session)],
 ) -> UserRepository:
-    return UserRepository(session)
+    return UserRepository(session, read_session)
 
 
 def get_user_service(
@@ -0,0 +1,195 @@
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _format_labels(names: Iterable[str], values: Iterable[Any]) -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    ]
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(float(value))
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues: Any):
+        series = self._series.get(labelvalues)
+
+        if series is None:
+            series = self._series.setdefault(
+                labelvalues, [[0] * len(self.buckets), 0.0, 0]
+            )
+
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        for labelvalues, (counts, total, count) in list(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    (*self.labelnames, "le"),
+                    (*labelvalues, _format_value(bound)),
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+
+        return lines
+
+    def clear(self):
+        self._series.clear()
+
+
+class StatsGauges:
+    def __init__(
+        self,
+        prefix: str,
+        documentation: str,
+        collect: Callable[[], dict[str, Any]],
+    ):
+        self.prefix = prefix
+        self.documentation = documentation
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = []
+
+        for key, value in self.collect().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+
+            name = f"{self.prefix}_{key}"
+            lines.extend([
+                f"# HELP {name} {self.documentation} ({key})",
+                f"# TYPE {name} gauge",
+                f"{name} {_format_value(value)}",
+            ])
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Histogram | StatsGauges] = {}
+
+    def register(self, metric: Histogram | StatsGauges):
+        key = getattr(metric, "name", None) or metric.prefix
+        self._metrics[key] = metric
+
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route, method and status.",
+        ("method", "route", "status"),
+    )
+)
+DB_QUERY_DURATION = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Database cursor execution time by statement type.",
+        ("operation",),
+    )
+)
+HASHING_DURATION = registry.register(
+    Histogram(
+        "password_hashing_duration_seconds",
+        "Time spent hashing or verifying passwords in the worker pool.",
+        ("operation",),
+    )
+)
+HASHING_QUEUE_WAIT = registry.register(
+    Histogram(
+        "password_hashing_queue_wait_seconds",
+        "Time password hashing jobs waited for a pool worker.",
+    )
+)
+
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, *args):
+        started_at = conn.info.pop("query_started_at", None)
+
+        if started_at is not None:
+            operation = statement.lstrip().split(None, 1)[0].upper()
+            DB_QUERY_DURATION.observe(
+                time.perf_counter() - started_at, operation
+            )
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
@@ -1,8 +1,29 @@
-from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    event,
+    func,
+)
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format=(
+            "%(year)04d-%(month)02d-%(day)02d "
+            "%(hour)02d:%(minute)02d:%(second)02d"
+        )
+    ),
+    "sqlite",
+)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -11,10 +32,130 @@ class User(Base):
     username = Column(String(30), unique=True, nullable=False)
     password = Column(String(255), nullable=False)
     email = Column(String, unique=True)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(
-        DateTime, server_default=func.now(), onupdate=func.now()
+        Timestamp, server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
     def to_dict(self):
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+
+
+class UserCount(Base):
+    __tablename__ = "user_counts"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    total = Column(BigInteger, nullable=False, server_default="0")
+
+
+# SQLite has no trigram indexes, so search goes through an FTS5 table
+# with the trigram tokenizer kept in sync with users by triggers.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE users_search USING fts5("
+    "username, email, content='users', content_rowid='id', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER users_search_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_search(rowid, username, email) "
+    "VALUES (new.id, new.username, new.email); END",
+    "CREATE TRIGGER users_search_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); END",
+    "CREATE TRIGGER users_search_au AFTER UPDATE OF username, email "
+    "ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); "
+    "INSERT INTO users_search(rowid, username, email) "
+    "VALUES (new.id, new.username, new.email); END",
+)
+
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql"
+    ),
+)
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        User.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    User.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS users_search").execute_if(dialect="sqlite"),
+)
+
+# user_counts holds a single row kept in step with users by triggers, so
+# list totals can be read without scanning the table.
+USER_COUNTS_SEED = (
+    "INSERT INTO user_counts (id, total) SELECT 1, count(*) FROM users"
+)
+SQLITE_COUNTER_DDL = (
+    "CREATE TRIGGER user_counts_ai AFTER INSERT ON users BEGIN "
+    "UPDATE user_counts SET total = total + 1 WHERE id = 1; END",
+    "CREATE TRIGGER user_counts_ad AFTER DELETE ON users BEGIN "
+    "UPDATE user_counts SET total = total - 1 WHERE id = 1; END",
+)
+POSTGRESQL_COUNTER_DDL = (
+    "CREATE OR REPLACE FUNCTION user_counts_refresh() RETURNS trigger "
+    "LANGUAGE plpgsql AS $$ BEGIN "
+    "IF TG_OP = 'INSERT' THEN "
+    "UPDATE user_counts SET total = total + "
+    "(SELECT count(*) FROM changed_rows) WHERE id = 1; "
+    "ELSE "
+    "UPDATE user_counts SET total = total - "
+    "(SELECT count(*) FROM changed_rows) WHERE id = 1; "
+    "END IF; RETURN NULL; END $$",
+    "CREATE TRIGGER user_counts_ai AFTER INSERT ON users "
+    "REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT "
+    "EXECUTE FUNCTION user_counts_refresh()",
+    "CREATE TRIGGER user_counts_ad AFTER DELETE ON users "
+    "REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT "
+    "EXECUTE FUNCTION user_counts_refresh()",
+)
+
+
+COUNTER_DDL = {
+    "sqlite": SQLITE_COUNTER_DDL,
+    "postgresql": POSTGRESQL_COUNTER_DDL,
+}
+
+
+# create_all fires after_create on existing databases too, so the seed and
+# triggers only run when user_counts itself was just created.
+@event.listens_for(Base.metadata, "after_create")
+def create_user_counter(target, connection, tables=(), **kw):
+    if UserCount.__table__ not in tables:
+        return
+
+    connection.execute(DDL(USER_COUNTS_SEED))
+    for statement in COUNTER_DDL.get(connection.dialect.name, ()):
+        connection.execute(DDL(statement))
+
+
+event.listen(
+    Base.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS user_counts_refresh()").execute_if(
+        dialect="postgresql"
+    ),
+)
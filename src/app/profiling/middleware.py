@@ -0,0 +1,88 @@
+import cProfile
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.app.profiling.profiler import ProfileStore
+from src.app.security.security import is_internal_token
+
+PROFILE_HEADER = b"x-profile"
+TOKEN_HEADER = b"x-internal-token"
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, store: ProfileStore):
+        self.app = app
+        self.store = store
+        self._active = False
+        self._overlapping = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            if self._active:
+                self._overlapping += 1
+
+            await self.app(scope, receive, send)
+            return
+
+        # cProfile hooks the event-loop thread, not the request's task:
+        # whatever else runs on the loop while this request awaits lands in
+        # the same report. Only one request is profiled at a time, and the
+        # requests that overlapped it are counted in the report metadata.
+        self._active = True
+        self._overlapping = 0
+        profile_id = self.store.new_id()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started_at = time.perf_counter()
+
+        try:
+            profiler.enable()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+
+            route = scope.get("route")
+            await run_in_threadpool(
+                self.store.save,
+                profile_id,
+                profiler,
+                {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path_format", None),
+                    "status": status_code,
+                    "duration_ms": (time.perf_counter() - started_at) * 1000,
+                    "overlapping_requests": self._overlapping,
+                    "created_at": time.time(),
+                },
+            )
+
+    def _should_profile(self, scope: Scope) -> bool:
+        headers = dict(scope["headers"])
+
+        if headers.get(PROFILE_HEADER) not in {b"1", b"true"}:
+            return False
+
+        token = headers.get(TOKEN_HEADER)
+
+        return (
+            not self._active
+            and token is not None
+            and is_internal_token(token.decode("latin-1"))
+        )
@@ -0,0 +1,90 @@
+import cProfile
+import io
+import json
+import pstats
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from src.app.settings.settings import get_settings
+
+PROFILE_ID_PATTERN = re.compile(r"[0-9a-f]{24}")
+
+
+class ProfileStore:
+    def __init__(self, directory: Path, *, max_reports: int):
+        self.directory = directory
+        self.max_reports = max_reports
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{time.time_ns():016x}{secrets.token_hex(4)}"
+
+    def save(
+        self, profile_id: str, profiler: cProfile.Profile, metadata: dict
+    ):
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        profiler.dump_stats(self._path(profile_id, "prof"))
+        self._path(profile_id, "json").write_text(
+            json.dumps({"id": profile_id, **metadata}), encoding="utf-8"
+        )
+
+        for stale_id in self._ids()[: -self.max_reports or None]:
+            self._path(stale_id, "prof").unlink(missing_ok=True)
+            self._path(stale_id, "json").unlink(missing_ok=True)
+
+    def list_reports(self) -> list[dict[str, Any]]:
+        reports = []
+
+        for profile_id in reversed(self._ids()):
+            try:
+                reports.append(
+                    json.loads(
+                        self._path(profile_id, "json").read_text(
+                            encoding="utf-8"
+                        )
+                    )
+                )
+            except FileNotFoundError:
+                continue
+
+        return reports
+
+    def report(
+        self, profile_id: str, *, sort: str = "cumulative", limit: int = 50
+    ) -> Optional[str]:
+        if not PROFILE_ID_PATTERN.fullmatch(profile_id):
+            return None
+
+        path = self._path(profile_id, "prof")
+        if not path.exists():
+            return None
+
+        buffer = io.StringIO()
+        pstats.Stats(str(path), stream=buffer).sort_stats(sort).print_stats(
+            limit
+        )
+
+        return buffer.getvalue()
+
+    def _ids(self) -> list[str]:
+        if not self.directory.exists():
+            return []
+
+        return sorted(
+            path.stem
+            for path in self.directory.glob("*.prof")
+            if PROFILE_ID_PATTERN.fullmatch(path.stem)
+        )
+
+    def _path(self, profile_id: str, suffix: str) -> Path:
+        return self.directory / f"{profile_id}.{suffix}"
+
+
+settings = get_settings()
+profile_store = ProfileStore(
+    Path(settings.PROFILE_DIR), max_reports=settings.PROFILE_MAX_REPORTS
+)
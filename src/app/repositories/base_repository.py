@@ -1,49 +1,203 @@
 from abc import ABC
-from typing import Any, Generic, List, Optional, TypeVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Row,
+    delete,
+    exc,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from src.app.database.database import is_connection_error
+
 ModelType = TypeVar("ModelType", bound=DeclarativeBase)
+ResultType = TypeVar("ResultType")
 
 
 class BaseRepository(Generic[ModelType], ABC):
-    def __init__(self, model: type[ModelType], session: AsyncSession):
+    def __init__(
+        self,
+        model: type[ModelType],
+        session: AsyncSession,
+        read_session: Optional[AsyncSession] = None,
+    ):
         self._model = model
         self._session = session
+        self._read_session = read_session or session
+        self._replica_session = self._read_session
 
     def get_session(self) -> AsyncSession:
         return self._session
 
+    async def close(self):
+        await self._session.close()
+
+        if self._replica_session is not self._session:
+            await self._replica_session.close()
+
+    def pin_to_primary(self):
+        self._read_session = self._session
+
+    async def _read(
+        self, operation: Callable[[AsyncSession], Awaitable[ResultType]]
+    ) -> ResultType:
+        if self._read_session is self._session:
+            return await operation(self._session)
+
+        try:
+            return await operation(self._read_session)
+        except (exc.OperationalError, exc.InterfaceError) as error:
+            if not is_connection_error(error):
+                raise
+
+            self.pin_to_primary()
+            return await operation(self._session)
+
     async def create(self, data: dict) -> ModelType:
-        db_obj = self._model(**data)
+        query = insert(self._model).values(**data).returning(self._model)
+        self.pin_to_primary()
 
-        self._session.add(db_obj)
-        await self._session.commit()
-        await self._session.refresh(db_obj)
+        try:
+            db_obj = await self._session.scalar(query)
+            await self._session.commit()
+        except exc.IntegrityError:
+            await self._session.rollback()
+            raise
 
         return db_obj
 
+    async def create_many(self, data: List[dict]) -> List[ModelType]:
+        query = insert(self._model).returning(
+            self._model, sort_by_parameter_order=True
+        )
+        self.pin_to_primary()
+        result = await self._session.scalars(query, data)
+
+        return result.all()
+
     async def get_all(
-        self, *, offset: int = 0, limit: int = 100
-    ) -> List[ModelType]:
-        query = select(self._model).offset(offset).limit(limit)
-        result = await self._session.execute(query)
+        self,
+        *,
+        offset: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[ModelType] | List[Row]:
+        query = (
+            select(*self._entities(columns))
+            .order_by(self._primary_key())
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await self._read(lambda session: session.execute(query))
+
+        return result.all() if columns else result.scalars().all()
+
+    async def get_page_after(
+        self,
+        *,
+        order_by: Sequence[str],
+        after: Optional[Sequence[Any]] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[ModelType] | List[Row]:
+        keys = [getattr(self._model, name) for name in order_by]
+        query = select(*self._entities(columns)).order_by(*keys).limit(limit)
+
+        if after is not None:
+            values = [
+                literal(value, key.type) for key, value in zip(keys, after)
+            ]
+            query = query.where(tuple_(*keys) > tuple_(*values))
+
+        result = await self._read(lambda session: session.execute(query))
+
+        return result.all() if columns else result.scalars().all()
+
+    async def stream_columns(
+        self, columns: Sequence[str], *, yield_per: int = 1000
+    ) -> AsyncIterator[Sequence[Any]]:
+        query = (
+            select(*(getattr(self._model, name) for name in columns))
+            .order_by(self._primary_key())
+            .execution_options(yield_per=yield_per)
+        )
+        result = await self._read(lambda session: session.stream(query))
+
+        async for partition in result.partitions():
+            yield partition
+
+    async def get_by_id(
+        self, obj_id: Any, *, for_update: bool = False
+    ) -> Optional[ModelType]:
+        if not for_update:
+            return await self._read(
+                lambda session: session.get(self._model, obj_id)
+            )
+
+        query = (
+            select(self._model)
+            .where(self._primary_key() == obj_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        self.pin_to_primary()
+
+        return await self._session.scalar(query)
 
-        return result.scalars().all()
+    async def get_many(
+        self,
+        obj_ids: Iterable[Any],
+        *,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[ModelType] | List[Row]:
+        obj_ids = list(dict.fromkeys(obj_ids))
+        if not obj_ids:
+            return []
 
-    async def get_by_id(self, obj_id: Any) -> Optional[ModelType]:
-        return await self._session.get(self._model, obj_id)
+        query = select(*self._entities(columns)).where(
+            self._primary_key().in_(obj_ids)
+        )
+        result = await self._read(lambda session: session.execute(query))
+
+        return result.all() if columns else result.scalars().all()
 
     async def get_by_field(
         self, field: str, value: Any
     ) -> Optional[ModelType]:
         query = select(self._model).where(getattr(self._model, field) == value)
-        result = await self._session.execute(query)
+        result = await self._read(lambda session: session.execute(query))
 
         return result.scalar_one_or_none()
 
+    async def find_columns(
+        self, columns: Sequence[str], *, limit: Optional[int] = None, **kwargs
+    ) -> List[Row]:
+        query = select(*(getattr(self._model, name) for name in columns))
+        query = query.where(*self._conditions(kwargs)).limit(limit)
+        result = await self._read(lambda session: session.execute(query))
+
+        return result.all()
+
     async def update(
         self, db_obj: type[ModelType], update_data: dict
     ) -> ModelType:
@@ -51,26 +205,100 @@ class BaseRepository(Generic[ModelType], ABC):
             if hasattr(db_obj, field):
                 setattr(db_obj, field, value)
 
+        self.pin_to_primary()
         await self._session.commit()
         await self._session.refresh(db_obj)
 
         return db_obj
 
     async def delete(self, db_obj: type[ModelType]) -> bool:
+        self.pin_to_primary()
         await self._session.delete(db_obj)
         await self._session.commit()
 
         return True
 
+    async def update_by_id(
+        self, obj_id: Any, update_data: dict
+    ) -> Optional[ModelType]:
+        values = {
+            field: value
+            for field, value in update_data.items()
+            if hasattr(self._model, field)
+        }
+        query = (
+            update(self._model)
+            .where(self._primary_key() == obj_id)
+            .values(**values)
+            .returning(self._model)
+        )
+        self.pin_to_primary()
+
+        try:
+            db_obj = await self._session.scalar(query)
+            await self._session.commit()
+        except exc.IntegrityError:
+            await self._session.rollback()
+            raise
+
+        return db_obj
+
+    async def delete_by_id(self, obj_id: Any) -> bool:
+        primary_key = self._primary_key()
+        query = delete(self._model).where(primary_key == obj_id)
+        self.pin_to_primary()
+
+        deleted_id = await self._session.scalar(query.returning(primary_key))
+        await self._session.commit()
+
+        return deleted_id is not None
+
+    def _primary_key(self):
+        return self._model.__mapper__.primary_key[0]
+
+    def _entities(self, columns: Optional[Sequence[str]]) -> list:
+        if not columns:
+            return [self._model]
+
+        return [getattr(self._model, name) for name in columns]
+
+    def _conditions(self, filters: dict) -> list:
+        return [
+            getattr(self._model, key) == value
+            for key, value in filters.items()
+            if hasattr(self._model, key)
+        ]
+
     async def exists(self, **kwargs) -> bool:
-        conditions = []
-        for key, value in kwargs.items():
-            if hasattr(self._model, key):
-                conditions.append(getattr(self._model, key) == value)
+        conditions = self._conditions(kwargs)
 
         if conditions:
-            query = select(self._model).where(*conditions)
-            result = await self._session.execute(query)
-            return result.scalar_one_or_none is not None
+            query = select(exists().where(*conditions))
+            return bool(await self._session.scalar(query))
 
         return False
+
+    async def count(self, *, primary: bool = False, **kwargs) -> int:
+        query = (
+            select(func.count())
+            .select_from(self._model)
+            .where(*self._conditions(kwargs))
+        )
+
+        if primary:
+            return await self._session.scalar(query)
+
+        return await self._read(lambda session: session.scalar(query))
+
+    async def estimate_count(self) -> Optional[int]:
+        if self._session.bind.dialect.name != "postgresql":
+            return None
+
+        query = text(
+            "SELECT reltuples::bigint FROM pg_class "
+            "WHERE oid = to_regclass(:table_name)"
+        ).bindparams(table_name=self._model.__table__.name)
+        estimate = await self._read(lambda session: session.scalar(query))
+
+        # reltuples is -1 until the table has been vacuumed or analyzed.
+        return estimate if estimate is not None and estimate >= 0 else None
@@ -1,49 +1,186 @@
-from typing import Optional
+import re
+from typing import Iterable, List, Optional, Sequence
 
-from sqlalchemy import or_, select
+from sqlalchemy import (
+    Row,
+    case,
+    column,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.app.models.user import User
+from src.app.models.user import User, UserCount
 from src.app.repositories.base_repository import BaseRepository
 
 
 class UserRepository(BaseRepository[User]):
-    def __init__(self, session: AsyncSession):
-        super().__init__(User, session)
+    UNIQUE_CONSTRAINT_FIELDS = {
+        "users_email_key": "email",
+        "ix_users_email_lower": "email",
+        "users_username_key": "username",
+    }
+    # SQLite reports no constraint name, only the columns or the index.
+    SQLITE_UNIQUE_FAILED = re.compile(
+        r"UNIQUE constraint failed: (?:index '(\w+)'|users\.(\w+)$)"
+    )
+    SEARCH_TABLE = "users_search"
+    TRIGRAM_LENGTH = 3
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        read_session: Optional[AsyncSession] = None,
+    ):
+        super().__init__(User, session, read_session)
+
+    @staticmethod
+    def email_equals(email: str):
+        return func.lower(User.email) == email.lower()
 
     async def get_by_email(self, email: str) -> Optional[User]:
-        return await self.get_by_field("email", email)
+        query = select(User).where(self.email_equals(email))
+        result = await self._read(lambda session: session.execute(query))
+
+        return result.scalar_one_or_none()
 
     async def get_by_username(self, username: str) -> Optional[User]:
         return await self.get_by_field("username", username)
 
-    async def get_by_email_or_username(
-        self, email: str, username: str
-    ) -> Optional[User]:
-        query = select(User).where(
-            or_(User.email == email, User.username == username)
+    async def get_taken_emails_and_usernames(
+        self, emails: Iterable[str], usernames: Iterable[str]
+    ) -> tuple[set[str], set[str]]:
+        emails = {email.lower() for email in emails}
+        usernames = set(usernames)
+        query = select(User.email, User.username).where(
+            or_(
+                func.lower(User.email).in_(emails),
+                User.username.in_(usernames),
+            )
         )
 
         session = self.get_session()
         result = await session.execute(query)
 
-        return result.scalar_one_or_none()
+        taken_emails, taken_usernames = set(), set()
+        for email, username in result:
+            if email.lower() in emails:
+                taken_emails.add(email.lower())
+            if username in usernames:
+                taken_usernames.add(username)
+
+        return taken_emails, taken_usernames
+
+    async def replace_password_hash(
+        self, user_id: int, old_hash: str, new_hash: str
+    ) -> bool:
+        query = (
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
+            .returning(User.id)
+        )
+        self.pin_to_primary()
+
+        updated_id = await self._session.scalar(query)
+        await self._session.commit()
+
+        return updated_id is not None
+
+    async def get_maintained_count(self) -> Optional[int]:
+        query = select(UserCount.total).where(UserCount.id == 1)
+
+        return await self._read(lambda session: session.scalar(query))
 
-    async def email_already_exists(self, email: str) -> bool:
-        return await self.exists(email=email)
+    async def search(
+        self,
+        term: str,
+        *,
+        after: Optional[Sequence[int]] = None,
+        limit: int = 20,
+    ) -> List[Row]:
+        term = term.lower()
+        prefix = self.escape_like(term) + "%"
+        username, email = func.lower(User.username), func.lower(User.email)
+        rank = case(
+            (or_(username == term, email == term), 0),
+            (
+                or_(
+                    username.like(prefix, escape="\\"),
+                    email.like(prefix, escape="\\"),
+                ),
+                1,
+            ),
+            else_=2,
+        )
+
+        def run(session: AsyncSession):
+            dialect = session.bind.dialect.name
+            matches = (
+                select(User.id, User.username, User.email, rank.label("rank"))
+                .where(self._search_condition(dialect, term))
+                .subquery()
+            )
+            query = (
+                select(matches)
+                .order_by(matches.c.rank, matches.c.id)
+                .limit(limit)
+            )
+
+            if after is not None:
+                query = query.where(
+                    tuple_(matches.c.rank, matches.c.id)
+                    > tuple_(*(literal(value) for value in after))
+                )
+
+            return session.execute(query)
+
+        result = await self._read(run)
+
+        return result.all()
 
-    async def username_already_exists(self, username: str) -> bool:
-        return await self.exists(username=username)
+    def _search_condition(self, dialect: str, term: str):
+        # On SQLite substring matching goes through the FTS5 trigram
+        # table, which needs at least three characters to match anything.
+        if dialect == "sqlite" and len(term) >= self.TRIGRAM_LENGTH:
+            search = table(self.SEARCH_TABLE, column("rowid"))
+            phrase = '"' + term.replace('"', '""') + '"'
+
+            return User.id.in_(
+                select(search.c.rowid).where(
+                    literal_column(self.SEARCH_TABLE).op("MATCH")(phrase)
+                )
+            )
+
+        pattern = "%" + self.escape_like(term) + "%"
+
+        return or_(
+            User.username.ilike(pattern, escape="\\"),
+            User.email.ilike(pattern, escape="\\"),
+        )
+
+    @staticmethod
+    def escape_like(value: str) -> str:
+        return (
+            value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
 
-    async def email_or_username_exists(
-        self, email: str, username: str
-    ) -> tuple[bool, str]:
-        user = await self.get_by_email_or_username(email, username)
+    @classmethod
+    def get_conflicting_field(cls, error: IntegrityError) -> Optional[str]:
+        diag = getattr(error.orig, "diag", None)
+        constraint = getattr(diag, "constraint_name", None)
 
-        if user:
-            if user.email == email:
-                return True, "email"
-            elif user.username == username:
-                return True, "username"
+        if constraint is None:
+            match = cls.SQLITE_UNIQUE_FAILED.search(str(error.orig))
+            if match:
+                index, field = match.groups()
+                constraint = index or f"users_{field}_key"
 
-        return False, ""
+        return cls.UNIQUE_CONSTRAINT_FIELDS.get(constraint)
@@ -0,0 +1,10 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    @staticmethod
+    def render(content: Any) -> bytes:
+        return to_json(content)
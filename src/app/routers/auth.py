@@ -1,13 +1,17 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 
 from src.app.dependencies.dependencies import get_auth_service
 from src.app.models.user import User
 from src.app.schemas.schemas import Token
-from src.app.security.security import get_current_user
+from src.app.security.security import (
+    get_client_ip,
+    get_current_user,
+    login_rate_limiter,
+)
 from src.app.services.auth_service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -15,12 +19,17 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/login", status_code=HTTPStatus.OK, response_model=Token)
 async def login_for_access_token(
+    request: Request,
+    background_tasks: BackgroundTasks,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
 ):
-    token_data = await auth_service.authenticate_and_create_token(
-        form_data.username, form_data.password
-    )
+    login_rate_limiter.check(get_client_ip(request), form_data.username)
+
+    async with login_rate_limiter.admit():
+        token_data = await auth_service.authenticate_and_create_token(
+            form_data.username, form_data.password, background_tasks
+        )
     return token_data
 
 
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from src.app.database.connection import db_handler
+from src.app.profiling.profiler import profile_store
+from src.app.security.security import verify_internal_token
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_internal_token)],
+)
+
+
+@router.get("/db/pool", status_code=HTTPStatus.OK)
+async def read_pool_status():
+    return db_handler.pool_status()
+
+
+@router.get("/profiles", status_code=HTTPStatus.OK)
+async def list_profiles():
+    return profile_store.list_reports()
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    status_code=HTTPStatus.OK,
+    response_class=PlainTextResponse,
+)
+async def read_profile(
+    profile_id: str,
+    sort: Literal["cumulative", "tottime", "calls"] = "cumulative",
+    limit: Annotated[int, Query(gt=0, le=500)] = 50,
+):
+    report = profile_store.report(profile_id, sort=sort, limit=limit)
+
+    if report is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail="Profile not found"
+        )
+
+    return report
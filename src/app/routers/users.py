@@ -1,23 +1,38 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
 
 from src.app.dependencies.dependencies import get_user_service
 from src.app.models.user import User
+from src.app.responses.responses import FastJSONResponse
 from src.app.schemas.schemas import (
     FilterPage,
     Message,
+    SearchPage,
+    UserBulkCreate,
+    UserBulkResult,
     UserList,
+    UserLookup,
+    UserLookupResult,
+    UserPatch,
     UserPublic,
     UserSchema,
 )
 from src.app.security.security import get_current_user
+from src.app.services.etag import etag_matches
 from src.app.services.user_service import UserService
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag}
+    )
+
+
 @router.post("/", status_code=HTTPStatus.CREATED, response_model=UserPublic)
 async def create_user(
     user: UserSchema,
@@ -27,23 +42,123 @@ async def create_user(
     return user
 
 
-@router.get("/", status_code=HTTPStatus.OK, response_model=UserList)
+@router.post("/bulk", status_code=HTTPStatus.OK, response_model=UserBulkResult)
+async def create_users(
+    users: UserBulkCreate,
+    current_user: Annotated[User, Depends(get_current_user)],
+    user_service: Annotated[UserService, Depends(get_user_service)],
+):
+    return await user_service.create_users(users)
+
+
+@router.post(
+    "/lookup", status_code=HTTPStatus.OK, response_model=UserLookupResult
+)
+async def lookup_users(
+    lookup: UserLookup,
+    current_user: Annotated[User, Depends(get_current_user)],
+    user_service: Annotated[UserService, Depends(get_user_service)],
+):
+    return FastJSONResponse(await user_service.lookup_users(lookup.ids))
+
+
+@router.get(
+    "/",
+    status_code=HTTPStatus.OK,
+    response_model=UserList,
+    response_model_exclude_none=True,
+)
 async def read_users(
     current_user: Annotated[User, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
     filter_users: Annotated[FilterPage, Query()],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    users = await user_service.get_users(filter_users)
-    return {"users": users}
+    total = None
+    if filter_users.include_total:
+        total = await user_service.count_users(filter_users.include_total)
+
+    if if_none_match:
+        etag = await user_service.get_users_etag(filter_users, total)
+
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    # Rows are built straight into the payload: they come from the
+    # database already validated, so the response model only documents
+    # the shape.
+    if filter_users.pagination == "cursor" or filter_users.cursor:
+        users, next_cursor = await user_service.get_users_by_cursor(
+            filter_users
+        )
+        content = {"users": user_service.to_public(users)}
+        if next_cursor is not None:
+            content["next_cursor"] = next_cursor
+        etag = user_service.users_etag(users, next_cursor is not None, total)
+    else:
+        users = await user_service.get_users(filter_users)
+        content = {"users": user_service.to_public(users)}
+        etag = user_service.users_etag(users, total=total)
+
+    if total is not None:
+        content["total"], content["total_mode"] = total
+
+    return FastJSONResponse(content, headers={"ETag": etag})
+
+
+@router.get("/export", status_code=HTTPStatus.OK)
+async def export_users(
+    current_user: Annotated[User, Depends(get_current_user)],
+    user_service: Annotated[UserService, Depends(get_user_service)],
+    export_format: Annotated[
+        Literal["ndjson", "csv"], Query(alias="format")
+    ] = "ndjson",
+):
+    media_types = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+    filename = f"users.{export_format}"
+
+    return StreamingResponse(
+        user_service.export_users(export_format),
+        media_type=media_types[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@router.get(
+    "/search",
+    status_code=HTTPStatus.OK,
+    response_model=UserList,
+    response_model_exclude_none=True,
+)
+async def search_users(
+    current_user: Annotated[User, Depends(get_current_user)],
+    user_service: Annotated[UserService, Depends(get_user_service)],
+    search: Annotated[SearchPage, Query()],
+):
+    users, next_cursor = await user_service.search_users(search)
+    content = {"users": user_service.to_public(users)}
+    if next_cursor is not None:
+        content["next_cursor"] = next_cursor
+
+    return FastJSONResponse(content)
 
 
 @router.get("/{user_id}", status_code=HTTPStatus.OK, response_model=UserPublic)
 async def read_user_by_id(
     user_id: int,
+    response: Response,
     current_user: Annotated[User, Depends(get_current_user)],
     user_service: Annotated[UserService, Depends(get_user_service)],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
+    if if_none_match:
+        etag = await user_service.get_user_etag(user_id)
+
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     user = await user_service.get_user_by_id(user_id)
+    response.headers["ETag"] = user_service.users_etag([user])
     return user
 
 
@@ -58,6 +173,18 @@ async def update_user(
     return updated_user
 
 
+@router.patch(
+    "/{user_id}", status_code=HTTPStatus.OK, response_model=UserPublic
+)
+async def patch_user(
+    user_id: int,
+    user: UserPatch,
+    current_user: Annotated[User, Depends(get_current_user)],
+    user_service: Annotated[UserService, Depends(get_user_service)],
+):
+    return await user_service.patch_user(user_id, user, current_user)
+
+
 @router.delete("/{user_id}", status_code=HTTPStatus.OK, response_model=Message)
 async def delete_user(
     user_id: int,
@@ -1,5 +1,9 @@
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
+from src.app.settings.settings import get_settings
+
 
 class Message(BaseModel):
     message: str
@@ -11,6 +15,12 @@ class UserSchema(BaseModel):
     password: str
 
 
+class UserPatch(BaseModel):
+    username: str | None = None
+    email: EmailStr | None = None
+    password: str | None = None
+
+
 class UserPublic(BaseModel):
     id: int
     username: str
@@ -18,8 +28,40 @@ class UserPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+UserBulkCreate = Annotated[
+    list[UserSchema], Field(min_length=1, max_length=1000)
+]
+
+
+class UserBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class UserBulkResult(BaseModel):
+    created: list[UserPublic]
+    errors: list[UserBulkError]
+
+
+class UserLookup(BaseModel):
+    ids: list[int] = Field(
+        min_length=1, max_length=get_settings().USER_LOOKUP_MAX_IDS
+    )
+
+
+class UserLookupResult(BaseModel):
+    users: list[UserPublic]
+    missing: list[int]
+
+
+CountMode = Literal["exact", "estimate", "counter"]
+
+
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
+    total: int | None = None
+    total_mode: CountMode | None = None
 
 
 class Token(BaseModel):
@@ -30,3 +72,13 @@ class Token(BaseModel):
 class FilterPage(BaseModel):
     offset: int = Field(ge=0, default=0)
     limit: int = Field(ge=0, default=10)
+    pagination: Literal["offset", "cursor"] = "offset"
+    order_by: Literal["id", "created_at"] = "id"
+    cursor: str | None = None
+    include_total: CountMode | None = None
+
+
+class SearchPage(BaseModel):
+    q: str = Field(min_length=1, max_length=100)
+    limit: int = Field(ge=1, le=100, default=20)
+    cursor: str | None = None
@@ -0,0 +1,114 @@
+import argparse
+import json
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+MIN_MEMORY_COST = 19 * 1024
+MAX_TIME_COST = 10
+SAMPLE_PASSWORD = "calibration-password"
+
+
+@dataclass(frozen=True)
+class Argon2Parameters:
+    time_cost: int = 3
+    memory_cost: int = 64 * 1024
+    parallelism: int = 4
+
+    def hasher(self) -> Argon2Hasher:
+        return Argon2Hasher(
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+        )
+
+    def measure_ms(self, *, samples: int = 3) -> float:
+        hasher = self.hasher()
+        durations = []
+
+        for _ in range(samples):
+            started_at = time.perf_counter()
+            hasher.hash(SAMPLE_PASSWORD)
+            durations.append((time.perf_counter() - started_at) * 1000)
+
+        return statistics.median(durations)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> Optional["Argon2Parameters"]:
+        if not path or not Path(path).exists():
+            return None
+
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+
+        return cls(
+            time_cost=data["time_cost"],
+            memory_cost=data["memory_cost"],
+            parallelism=data["parallelism"],
+        )
+
+    def save(self, path: str, *, measured_ms: float):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(
+            json.dumps({**asdict(self), "measured_ms": measured_ms}),
+            encoding="utf-8",
+        )
+
+
+def calibrate_argon2(
+    target_ms: float,
+    *,
+    max_memory_cost: int = 64 * 1024,
+    min_memory_cost: int = MIN_MEMORY_COST,
+    parallelism: int = 4,
+) -> tuple[Argon2Parameters, float]:
+    # Memory is the stronger defence, so it is kept as high as the target
+    # allows with a single pass before extra passes are added.
+    parameters = Argon2Parameters(1, max_memory_cost, parallelism)
+    measured_ms = parameters.measure_ms()
+
+    while measured_ms > target_ms and parameters.memory_cost > min_memory_cost:
+        parameters = Argon2Parameters(
+            1, max(parameters.memory_cost // 2, min_memory_cost), parallelism
+        )
+        measured_ms = parameters.measure_ms()
+
+    while parameters.time_cost < MAX_TIME_COST:
+        candidate = Argon2Parameters(
+            parameters.time_cost + 1, parameters.memory_cost, parallelism
+        )
+        candidate_ms = candidate.measure_ms()
+
+        if candidate_ms > target_ms:
+            break
+
+        parameters, measured_ms = candidate, candidate_ms
+
+    return parameters, measured_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pick Argon2 costs for a target hashing latency."
+    )
+    parser.add_argument("output")
+    parser.add_argument("--target-ms", type=float, default=200)
+    parser.add_argument("--max-memory-kib", type=int, default=64 * 1024)
+    parser.add_argument("--parallelism", type=int, default=4)
+    args = parser.parse_args()
+
+    parameters, measured_ms = calibrate_argon2(
+        args.target_ms,
+        max_memory_cost=args.max_memory_kib,
+        parallelism=args.parallelism,
+    )
+    parameters.save(args.output, measured_ms=measured_ms)
+
+    print(json.dumps({**asdict(parameters), "measured_ms": measured_ms}))
+
+
+if __name__ == "__main__":
+    main()
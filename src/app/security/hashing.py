@@ -0,0 +1,145 @@
+import asyncio
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from http import HTTPStatus
+from typing import Any, Callable, Literal
+
+from fastapi import HTTPException
+
+from src.app.metrics.metrics import HASHING_DURATION, HASHING_QUEUE_WAIT
+
+
+def _timed_call(func: Callable, *args) -> tuple[Any, float, float]:
+    started_at = time.monotonic()
+    result = func(*args)
+
+    return result, started_at, time.monotonic()
+
+
+class PasswordHashingPool:
+    def __init__(
+        self,
+        *,
+        executor: Literal["thread", "process"] = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+    ):
+        self._executor_kind = executor
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._executor: Executor | None = None
+        self._initializer: Callable | None = None
+        self._initargs: tuple = ()
+        # Batch hashing shares one limiter across requests and leaves a
+        # worker free, so logins are not starved by a bulk import.
+        self._batch_workers = max(max_workers - 1, 1)
+        self._batch_limiter: asyncio.Semaphore | None = None
+        self._batch_loop: asyncio.AbstractEventLoop | None = None
+
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._executor_kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    self._max_workers,
+                    initializer=self._initializer,
+                    initargs=self._initargs,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self._max_workers,
+                    thread_name_prefix="password-hashing",
+                    initializer=self._initializer,
+                    initargs=self._initargs,
+                )
+
+        return self._executor
+
+    async def run(self, func: Callable, *args) -> Any:
+        if self._in_flight >= self._max_workers + self._max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail="Server busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        self._in_flight += 1
+        self._submitted += 1
+        submitted_at = time.monotonic()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, finished_at = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        finally:
+            self._in_flight -= 1
+
+        queue_wait = max(started_at - submitted_at, 0.0)
+        self._completed += 1
+        self._queue_wait_total += queue_wait
+        self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+        self._run_total += finished_at - started_at
+
+        HASHING_QUEUE_WAIT.observe(queue_wait)
+        HASHING_DURATION.observe(finished_at - started_at, func.__name__)
+
+        return result
+
+    def _get_batch_limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+
+        if self._batch_loop is not loop:
+            self._batch_loop = loop
+            self._batch_limiter = asyncio.Semaphore(self._batch_workers)
+
+        return self._batch_limiter
+
+    async def map(self, func: Callable, *iterables) -> list[Any]:
+        limiter = self._get_batch_limiter()
+
+        async def run_one(*args):
+            async with limiter:
+                return await self.run(func, *args)
+
+        return await asyncio.gather(
+            *(run_one(*args) for args in zip(*iterables))
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "executor": self._executor_kind,
+            "max_workers": self._max_workers,
+            "batch_workers": self._batch_workers,
+            "max_queue": self._max_queue,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - self._max_workers, 0),
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "queue_wait_seconds_total": self._queue_wait_total,
+            "queue_wait_seconds_max": self._queue_wait_max,
+            "run_seconds_total": self._run_total,
+        }
+
+    def reinitialize(self, initializer: Callable, *initargs):
+        self._initializer = initializer
+        self._initargs = initargs
+        self.shutdown(wait=False)
+
+    def shutdown(self, *, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
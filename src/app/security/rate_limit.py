@@ -0,0 +1,126 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException
+
+
+class RateLimitBackend(ABC):
+    # Takes one token from the bucket at key and returns 0, or the number
+    # of seconds until a token becomes available.
+    @abstractmethod
+    def acquire(
+        self, key: str, *, capacity: float, refill_rate: float
+    ) -> float: ...
+
+    @abstractmethod
+    def clear(self): ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, *, shards: int = 16, max_keys: int = 100_000):
+        self._shards = [
+            (threading.Lock(), OrderedDict()) for _ in range(max(shards, 1))
+        ]
+        self._max_keys_per_shard = max(max_keys // len(self._shards), 1)
+
+    def acquire(
+        self, key: str, *, capacity: float, refill_rate: float
+    ) -> float:
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+
+        with lock:
+            tokens, updated_at = buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill_rate
+
+            buckets[key] = (tokens, now)
+
+            while len(buckets) > self._max_keys_per_shard:
+                buckets.popitem(last=False)
+
+        return retry_after
+
+    def clear(self):
+        for lock, buckets in self._shards:
+            with lock:
+                buckets.clear()
+
+
+class LoginRateLimiter:
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        *,
+        ip_limit: tuple[int, float],
+        account_limit: tuple[int, float],
+        max_concurrent: int,
+    ):
+        self._backend = backend
+        self._limits = {
+            "ip": (ip_limit[0], ip_limit[1] / 60),
+            "account": (account_limit[0], account_limit[1] / 60),
+        }
+        self._max_concurrent = max_concurrent
+
+        self._in_flight = 0
+        self._throttled = {"ip": 0, "account": 0}
+        self._rejected = 0
+
+    def check(self, ip: str, account: str):
+        for scope, key in (("ip", ip), ("account", account.lower())):
+            capacity, refill_rate = self._limits[scope]
+            retry_after = self._backend.acquire(
+                f"login:{scope}:{key}",
+                capacity=capacity,
+                refill_rate=refill_rate,
+            )
+
+            if retry_after:
+                self._throttled[scope] += 1
+                raise HTTPException(
+                    status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                    detail="Too many login attempts, try again later",
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if self._in_flight >= self._max_concurrent:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail="Server busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+
+    def reset(self):
+        self._backend.clear()
+        self._throttled = {"ip": 0, "account": 0}
+        self._rejected = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrent": self._max_concurrent,
+            "throttled_ip": self._throttled["ip"],
+            "throttled_account": self._throttled["account"],
+            "rejected": self._rejected,
+        }
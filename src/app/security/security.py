@@ -1,23 +1,83 @@
+import asyncio
+import ipaddress
+import secrets
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from zoneinfo import ZoneInfo
 
-from fastapi import Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, decode, encode
 from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
-from src.app.database.connection import db_handler
+from src.app.database.connection import get_read_session
+from src.app.metrics.metrics import StatsGauges, registry
 from src.app.models.user import User
-from src.app.settings.settings import Settings
+from src.app.repositories.user_repository import UserRepository
+from src.app.security.cache import TTLCache
+from src.app.security.calibration import Argon2Parameters, calibrate_argon2
+from src.app.security.hashing import PasswordHashingPool
+from src.app.security.rate_limit import (
+    InMemoryRateLimitBackend,
+    LoginRateLimiter,
+)
+from src.app.settings.settings import get_settings
 
-pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/auth/login", refreshUrl="auth/refresh_token"
 )
-settings = Settings()
+internal_token_header = APIKeyHeader(name="X-Internal-Token", auto_error=False)
+settings = get_settings()
+pwd_context = PasswordHash((
+    (
+        Argon2Parameters.load(settings.ARGON2_PARAMETERS_FILE)
+        or Argon2Parameters(parallelism=settings.ARGON2_PARALLELISM)
+    ).hasher(),
+))
+hashing_pool = PasswordHashingPool(
+    executor=settings.HASHING_EXECUTOR,
+    max_workers=settings.HASHING_MAX_WORKERS,
+    max_queue=settings.HASHING_MAX_QUEUE,
+)
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+login_rate_limiter = LoginRateLimiter(
+    InMemoryRateLimitBackend(
+        shards=settings.RATE_LIMIT_SHARDS,
+        max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    ),
+    ip_limit=(settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE),
+    account_limit=(
+        settings.LOGIN_ACCOUNT_BURST,
+        settings.LOGIN_ACCOUNT_PER_MINUTE,
+    ),
+    max_concurrent=settings.LOGIN_MAX_CONCURRENT_VERIFICATIONS,
+)
+
+registry.register(
+    StatsGauges("password_hashing_pool", "Hashing pool", hashing_pool.stats)
+)
+registry.register(
+    StatsGauges("user_cache", "Authenticated user cache", user_cache.stats)
+)
+registry.register(
+    StatsGauges("token_cache", "Verified token cache", token_cache.stats)
+)
+registry.register(
+    StatsGauges(
+        "login_rate_limit", "Login admission control", login_rate_limiter.stats
+    )
+)
 
 
 def create_access_token(claims: dict):
@@ -36,6 +96,18 @@ def create_access_token(claims: dict):
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    payload = token_cache.get(token)
+
+    if payload is None:
+        payload = decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+        token_cache.set(token, payload, expires_at=payload.get("exp"))
+
+    return payload
+
+
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
@@ -44,8 +116,66 @@ def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _apply_password_hashing(parameters: Argon2Parameters):
+    pwd_context.hashers = (parameters.hasher(),)
+    pwd_context.current_hasher = pwd_context.hashers[0]
+
+
+def configure_password_hashing(parameters: Argon2Parameters):
+    _apply_password_hashing(parameters)
+    # Worker processes keep the hasher they imported, so restart them with
+    # the new parameters applied on startup.
+    hashing_pool.reinitialize(_apply_password_hashing, parameters)
+
+
+async def calibrate_password_hashing() -> dict | None:
+    if not settings.ARGON2_CALIBRATE or Argon2Parameters.load(
+        settings.ARGON2_PARAMETERS_FILE
+    ):
+        return None
+
+    parameters, measured_ms = await asyncio.to_thread(
+        calibrate_argon2,
+        settings.ARGON2_TARGET_MS,
+        max_memory_cost=settings.ARGON2_MAX_MEMORY_KIB,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+    parameters.save(settings.ARGON2_PARAMETERS_FILE, measured_ms=measured_ms)
+
+    configure_password_hashing(parameters)
+
+    return {**asdict(parameters), "measured_ms": measured_ms}
+
+
+async def get_password_hash_async(password: str):
+    return await hashing_pool.run(get_password_hash, password)
+
+
+async def get_password_hashes_async(passwords: list[str]):
+    return await hashing_pool.map(get_password_hash, passwords)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await hashing_pool.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await hashing_pool.run(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
 async def get_current_user(
-    session: AsyncSession = Depends(db_handler.get_session),
+    session: AsyncSession = Depends(get_read_session),
     token: str = Depends(oauth2_scheme),
 ):
     credentials_exception = HTTPException(
@@ -55,9 +185,7 @@ async def get_current_user(
     )
 
     try:
-        payload = decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_access_token(token)
         subject_email = payload.get("sub")
 
         if not subject_email:
@@ -69,11 +197,75 @@ async def get_current_user(
     except ExpiredSignatureError:
         raise credentials_exception
 
+    cached_user = user_cache.get(subject_email.lower())
+
+    if cached_user is not None:
+        user = User(**cached_user)
+        make_transient_to_detached(user)
+
+        return await session.merge(user, load=False)
+
     user = await session.scalar(
-        select(User).where(User.email == subject_email)
+        select(User).where(UserRepository.email_equals(subject_email))
     )
 
     if not user:
         raise credentials_exception
 
+    user_cache.set(subject_email.lower(), user.to_dict())
+
     return user
+
+
+def invalidate_cached_user(email: str):
+    user_cache.invalidate(email.lower())
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    for trusted in settings.TRUSTED_PROXY_IPS:
+        try:
+            if ipaddress.ip_address(host) in ipaddress.ip_network(
+                trusted, strict=False
+            ):
+                return True
+        except ValueError:
+            if host == trusted:
+                return True
+
+    return False
+
+
+def get_client_ip(request: Request) -> str:
+    host = request.client.host if request.client else "unknown"
+
+    if not _is_trusted_proxy(host):
+        return host
+
+    # The rightmost untrusted hop is the last address a trusted proxy saw;
+    # anything left of it can be forged by the client.
+    forwarded = request.headers.get("x-forwarded-for", "").split(",")
+    for address in reversed([hop.strip() for hop in forwarded]):
+        if address and not _is_trusted_proxy(address):
+            return address
+
+    return host
+
+
+def is_internal_token(token: str | None) -> bool:
+    expected_token = settings.INTERNAL_API_TOKEN
+
+    return bool(
+        expected_token
+        and token
+        and secrets.compare_digest(token.encode(), expected_token.encode())
+    )
+
+
+def verify_internal_token(
+    token: str | None = Depends(internal_token_header),
+):
+    if not is_internal_token(token):
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN,
+            detail="Not enough permissions",
+        )
@@ -1,11 +1,15 @@
 from http import HTTPStatus
-from typing import Dict
+from typing import Dict, Optional
 
-from fastapi import HTTPException
+from fastapi import BackgroundTasks, HTTPException
 
 from src.app.models.user import User
 from src.app.repositories.user_repository import UserRepository
-from src.app.security.security import create_access_token, verify_password
+from src.app.security.security import (
+    create_access_token,
+    invalidate_cached_user,
+    verify_and_update_password_async,
+)
 from src.app.services.base_service import BaseService
 
 
@@ -14,7 +18,10 @@ class AuthService(BaseService[UserRepository]):
         super().__init__(repository)
 
     async def authenticate_and_create_token(
-        self, email: str, password: str
+        self,
+        email: str,
+        password: str,
+        background_tasks: Optional[BackgroundTasks] = None,
     ) -> Dict[str, str]:
         user = await self._repository.get_by_email(email)
 
@@ -24,16 +31,41 @@ class AuthService(BaseService[UserRepository]):
                 detail="Incorrect email or password",
             )
 
-        if not verify_password(password, user.password):
+        valid, updated_hash = await verify_and_update_password_async(
+            password, user.password
+        )
+
+        if not valid:
             raise HTTPException(
                 status_code=HTTPStatus.UNAUTHORIZED,
                 detail="Incorrect email or password",
             )
 
+        if updated_hash and background_tasks is not None:
+            background_tasks.add_task(
+                self.rehash_password, user, user.password, updated_hash
+            )
+        elif updated_hash:
+            await self._repository.replace_password_hash(
+                user.id, user.password, updated_hash
+            )
+            invalidate_cached_user(user.email)
+
         access_token = create_access_token(claims={"sub": user.email})
 
         return {"access_token": access_token, "token_type": "bearer"}
 
+    async def rehash_password(self, user: User, old_hash: str, new_hash: str):
+        # Background tasks run after the request dependencies have been
+        # torn down, so the session is reopened here and closed afterwards.
+        try:
+            await self._repository.replace_password_hash(
+                user.id, old_hash, new_hash
+            )
+            invalidate_cached_user(user.email)
+        finally:
+            await self.close()
+
     async def refresh_token(self, user: User) -> Dict[str, str]:
         db_user = await self._repository.get_by_email(user.email)
         access_token = create_access_token(claims={"sub": db_user.email})
@@ -16,3 +16,6 @@ class BaseService(Generic[RepositoryType], ABC):
 
     async def commit(self):
         await self._session.commit()
+
+    async def close(self):
+        await self._repository.close()
@@ -0,0 +1,39 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence
+
+
+def _encode(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    return str(value)
+
+
+def compute_etag(versions: Iterable[Sequence[Any]], *extra: Any) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+
+    for version in versions:
+        digest.update(
+            "\x1f".join(_encode(value) for value in version).encode() + b";"
+        )
+
+    for value in extra:
+        digest.update(f"{value};".encode())
+
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    if not if_none_match or etag is None:
+        return False
+
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+
+    return etag.removeprefix("W/") in {
+        candidate.removeprefix("W/") for candidate in candidates
+    }
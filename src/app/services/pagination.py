@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Mapping, Sequence
+
+from fastapi import HTTPException
+
+KEYSET_ORDERINGS = {
+    "id": ("id",),
+    "created_at": ("created_at", "id"),
+}
+
+SEARCH_ORDERINGS = {
+    "search": ("rank", "id"),
+}
+
+_KEY_PARSERS = {
+    "id": int,
+    "rank": int,
+    "created_at": datetime.fromisoformat,
+}
+
+
+def encode_cursor(order_by: str, values: Sequence[Any]) -> str:
+    key = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    payload = json.dumps({"order_by": order_by, "key": key})
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    orderings: Mapping[str, Sequence[str]] = KEYSET_ORDERINGS,
+) -> tuple[str, list[Any]]:
+    invalid_cursor = HTTPException(
+        status_code=HTTPStatus.BAD_REQUEST,
+        detail="Invalid cursor",
+    )
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        order_by = payload["order_by"]
+        columns = orderings[order_by]
+
+        if len(payload["key"]) != len(columns):
+            raise invalid_cursor
+
+        values = [
+            _KEY_PARSERS[column](value)
+            for column, value in zip(columns, payload["key"])
+        ]
+
+    except (ValueError, TypeError, KeyError):
+        raise invalid_cursor
+
+    return order_by, values
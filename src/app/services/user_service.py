@@ -1,48 +1,313 @@
+import csv
+import io
+import json
 from http import HTTPStatus
-from typing import List, Optional
+from typing import AsyncIterator, List, Literal, Optional
 
 from fastapi import HTTPException
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError
 
+from src.app.metrics.metrics import StatsGauges, registry
 from src.app.models.user import User
 from src.app.repositories.user_repository import UserRepository
-from src.app.schemas.schemas import FilterPage, UserSchema
-from src.app.security.security import get_password_hash
+from src.app.schemas.schemas import (
+    CountMode,
+    FilterPage,
+    SearchPage,
+    UserPatch,
+    UserSchema,
+)
+from src.app.security.cache import TTLCache
+from src.app.security.security import (
+    get_password_hash_async,
+    get_password_hashes_async,
+    invalidate_cached_user,
+    verify_password_async,
+)
 from src.app.services.base_service import BaseService
+from src.app.services.etag import compute_etag
+from src.app.services.pagination import (
+    KEYSET_ORDERINGS,
+    SEARCH_ORDERINGS,
+    decode_cursor,
+    encode_cursor,
+)
+from src.app.settings.settings import get_settings
+
+user_count_cache = TTLCache(
+    maxsize=1, ttl=get_settings().USER_COUNT_CACHE_TTL_SECONDS
+)
+
+registry.register(
+    StatsGauges("user_count_cache", "Exact user count", user_count_cache.stats)
+)
 
 
 class UserService(BaseService[UserRepository]):
+    BULK_INSERT_CHUNK_SIZE = 500
+    EXPORT_COLUMNS = ("id", "username", "email")
+    PUBLIC_COLUMNS = ("id", "username", "email")
+    # updated_at only has second precision on SQLite, so the validator
+    # also hashes the public content of the row.
+    VERSION_COLUMNS = (*PUBLIC_COLUMNS, "updated_at")
+    LIST_COLUMNS = (*PUBLIC_COLUMNS, "created_at", "updated_at")
+
     def __init__(self, repository: UserRepository):
         super().__init__(repository)
 
     async def create_user(self, user_data: UserSchema) -> User:
-        exists, field = await self._repository.email_or_username_exists(
-            user_data.email, user_data.username
+        user_dict = user_data.model_dump()
+        user_dict["password"] = await get_password_hash_async(
+            user_data.password
         )
 
-        if exists:
+        try:
+            user = await self._repository.create(user_dict)
+
+        except IntegrityError as error:
+            field = self._repository.get_conflicting_field(error)
+
+            if field is None:
+                raise
+
             if field == "email":
                 raise HTTPException(
                     status_code=HTTPStatus.CONFLICT,
                     detail="Email already exists",
                 )
-            elif field == "username":
-                raise HTTPException(
-                    status_code=HTTPStatus.CONFLICT,
-                    detail="Username already exists",
-                )
 
-        user_dict = user_data.model_dump()
-        user_dict["password"] = get_password_hash(user_data.password)
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail="Username already exists",
+            )
+
+        user_count_cache.invalidate("users")
+
+        return user
+
+    async def create_users(self, users_data: List[UserSchema]) -> dict:
+        errors = {}
+        (
+            taken_emails,
+            taken_usernames,
+        ) = await self._repository.get_taken_emails_and_usernames(
+            (user_data.email for user_data in users_data),
+            (user_data.username for user_data in users_data),
+        )
+
+        candidates = []
+        for index, user_data in enumerate(users_data):
+            if user_data.email.lower() in taken_emails:
+                errors[index] = "Email already exists"
+            elif user_data.username in taken_usernames:
+                errors[index] = "Username already exists"
+            else:
+                candidates.append((index, user_data.model_dump()))
+
+            taken_emails.add(user_data.email.lower())
+            taken_usernames.add(user_data.username)
+
+        hashes = await get_password_hashes_async([
+            user_dict["password"] for _, user_dict in candidates
+        ])
+        for (_, user_dict), hashed_password in zip(candidates, hashes):
+            user_dict["password"] = hashed_password
+
+        created = []
+        for start in range(0, len(candidates), self.BULK_INSERT_CHUNK_SIZE):
+            chunk = candidates[start : start + self.BULK_INSERT_CHUNK_SIZE]
 
-        return await self._repository.create(user_dict)
+            try:
+                async with self._session.begin_nested():
+                    users = await self._repository.create_many([
+                        user_dict for _, user_dict in chunk
+                    ])
+                created.extend(zip((index for index, _ in chunk), users))
 
-    async def get_users(self, filter_params: FilterPage) -> List[User]:
+            except IntegrityError:
+                for index, user_dict in chunk:
+                    try:
+                        async with self._session.begin_nested():
+                            users = await self._repository.create_many([
+                                user_dict
+                            ])
+                        created.append((index, users[0]))
+
+                    except IntegrityError as error:
+                        field = self._repository.get_conflicting_field(error)
+                        if field is None:
+                            raise
+
+                        errors[index] = f"{field.capitalize()} already exists"
+
+        await self.commit()
+        user_count_cache.invalidate("users")
+
+        return {
+            "created": [user for _, user in sorted(created)],
+            "errors": [
+                {"index": index, "detail": detail}
+                for index, detail in sorted(errors.items())
+            ],
+        }
+
+    async def get_users(self, filter_params: FilterPage) -> List[Row]:
         return await self._repository.get_all(
             offset=filter_params.offset,
             limit=filter_params.limit,
+            columns=self.LIST_COLUMNS,
+        )
+
+    async def get_users_by_cursor(
+        self, filter_params: FilterPage
+    ) -> tuple[List[Row], Optional[str]]:
+        order_by, after = self._keyset(filter_params)
+        columns = KEYSET_ORDERINGS[order_by]
+        users = await self._repository.get_page_after(
+            order_by=columns,
+            after=after,
+            limit=filter_params.limit + 1,
+            columns=self.LIST_COLUMNS,
+        )
+
+        has_more = len(users) > filter_params.limit
+        users = users[: filter_params.limit]
+
+        next_cursor = None
+        if has_more and users:
+            next_cursor = encode_cursor(
+                order_by, [getattr(users[-1], column) for column in columns]
+            )
+
+        return users, next_cursor
+
+    async def search_users(
+        self, search_params: SearchPage
+    ) -> tuple[List[Row], Optional[str]]:
+        after = None
+        if search_params.cursor:
+            _, after = decode_cursor(search_params.cursor, SEARCH_ORDERINGS)
+
+        users = await self._repository.search(
+            search_params.q,
+            after=after,
+            limit=search_params.limit + 1,
+        )
+
+        has_more = len(users) > search_params.limit
+        users = users[: search_params.limit]
+
+        next_cursor = None
+        if has_more and users:
+            next_cursor = encode_cursor(
+                "search", [users[-1].rank, users[-1].id]
+            )
+
+        return users, next_cursor
+
+    async def count_users(self, mode: CountMode) -> tuple[int, CountMode]:
+        if mode == "counter":
+            total = await self._repository.get_maintained_count()
+        elif mode == "estimate":
+            total = await self._repository.estimate_count()
+        else:
+            total = None
+
+        if total is not None:
+            return total, mode
+
+        # Estimates only exist on Postgres; anywhere else, or before the
+        # table has statistics, the cached exact count is returned. It is
+        # read from the primary so a lagging replica cannot refill the
+        # cache right after a write invalidated it.
+        total = user_count_cache.get("users")
+        if total is None:
+            total = await self._repository.count(primary=True)
+            user_count_cache.set("users", total)
+
+        return total, "exact"
+
+    async def get_users_etag(
+        self, filter_params: FilterPage, total: Optional[tuple] = None
+    ) -> str:
+        if filter_params.pagination == "cursor" or filter_params.cursor:
+            order_by, after = self._keyset(filter_params)
+            rows = await self._repository.get_page_after(
+                order_by=KEYSET_ORDERINGS[order_by],
+                after=after,
+                limit=filter_params.limit + 1,
+                columns=self.VERSION_COLUMNS,
+            )
+
+            return self.users_etag(
+                rows[: filter_params.limit],
+                len(rows) > filter_params.limit,
+                total,
+            )
+
+        rows = await self._repository.get_all(
+            offset=filter_params.offset,
+            limit=filter_params.limit,
+            columns=self.VERSION_COLUMNS,
+        )
+
+        return self.users_etag(rows, total=total)
+
+    @classmethod
+    def to_public(cls, rows: List[Row]) -> List[dict]:
+        return [dict(zip(cls.PUBLIC_COLUMNS, row)) for row in rows]
+
+    @classmethod
+    def users_etag(
+        cls, users, has_more: bool = False, total: Optional[tuple] = None
+    ) -> str:
+        return compute_etag(
+            (
+                [getattr(user, column) for column in cls.VERSION_COLUMNS]
+                for user in users
+            ),
+            has_more,
+            *(total or ()),
         )
 
+    @staticmethod
+    def _keyset(filter_params: FilterPage) -> tuple[str, Optional[list]]:
+        if filter_params.cursor:
+            return decode_cursor(filter_params.cursor)
+
+        return filter_params.order_by, None
+
+    async def export_users(
+        self, export_format: Literal["ndjson", "csv"]
+    ) -> AsyncIterator[str]:
+        # The response is streamed after the request dependencies have
+        # been torn down, so the session is reopened here and closed once
+        # the last partition has been sent.
+        try:
+            if export_format == "csv":
+                yield self._to_csv([self.EXPORT_COLUMNS])
+
+            async for rows in self._repository.stream_columns(
+                self.EXPORT_COLUMNS
+            ):
+                if export_format == "csv":
+                    yield self._to_csv(rows)
+                else:
+                    yield "".join(
+                        json.dumps(dict(row._mapping)) + "\n" for row in rows
+                    )
+
+        finally:
+            await self.close()
+
+    @staticmethod
+    def _to_csv(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+
+        return buffer.getvalue()
+
     async def get_user_by_id(self, user_id: int) -> User:
         user = await self._repository.get_by_id(user_id)
 
@@ -54,6 +319,35 @@ class UserService(BaseService[UserRepository]):
 
         return user
 
+    async def lookup_users(self, user_ids: List[int]) -> dict:
+        user_ids = list(dict.fromkeys(user_ids))
+        rows = await self._repository.get_many(
+            user_ids, columns=self.PUBLIC_COLUMNS
+        )
+        found = {row.id: row for row in rows}
+
+        return {
+            "users": self.to_public([
+                found[user_id] for user_id in user_ids if user_id in found
+            ]),
+            "missing": [
+                user_id for user_id in user_ids if user_id not in found
+            ],
+        }
+
+    async def get_user_etag(self, user_id: int) -> Optional[str]:
+        rows = await self._repository.find_columns(
+            self.VERSION_COLUMNS, limit=1, id=user_id
+        )
+
+        return self.users_etag(rows) if rows else None
+
+    async def warm_up(self):
+        await self._repository.get_by_email("")
+        await self._repository.get_by_id(0)
+        await self.get_user_etag(0)
+        await self.get_users(FilterPage())
+
     async def get_user_by_email(self, user_email: str) -> User:
         user = await self._repository.get_by_email(user_email)
 
@@ -64,6 +358,22 @@ class UserService(BaseService[UserRepository]):
 
     async def update_user(
         self, user_id: int, user_data: UserSchema, current_user: User
+    ) -> User:
+        return await self._update_changed(
+            user_id, user_data.model_dump(), current_user
+        )
+
+    async def patch_user(
+        self, user_id: int, user_data: UserPatch, current_user: User
+    ) -> User:
+        return await self._update_changed(
+            user_id,
+            user_data.model_dump(exclude_unset=True, exclude_none=True),
+            current_user,
+        )
+
+    async def _update_changed(
+        self, user_id: int, user_data: dict, current_user: User
     ) -> User:
         if current_user.id != user_id:
             raise HTTPException(
@@ -71,22 +381,52 @@ class UserService(BaseService[UserRepository]):
                 detail="Not enough permissions",
             )
 
-        try:
-            updated_data = user_data.model_dump()
-            updated_data["password"] = get_password_hash(user_data.password)
+        # current_user may come from the principal cache or a replica, so
+        # the diff runs against the primary row, locked until the write.
+        cached_email = current_user.email
+        user = await self._repository.get_by_id(user_id, for_update=True)
 
-            updated_user = await self._repository.update(
-                current_user, updated_data
+        if not user:
+            await self.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail="User not found",
             )
-            return updated_user
 
-        except IntegrityError:
-            await self._session.rollback()
+        password = user_data.pop("password", None)
+        changes = {
+            field: value
+            for field, value in user_data.items()
+            if getattr(user, field) != value
+        }
+
+        if password is not None and not await verify_password_async(
+            password, user.password
+        ):
+            changes["password"] = await get_password_hash_async(password)
+
+        if not changes:
+            await self.commit()
+            return user
+
+        try:
+            updated_user = await self._repository.update_by_id(
+                user_id, changes
+            )
+
+        except IntegrityError as error:
+            if self._repository.get_conflicting_field(error) is None:
+                raise
+
             raise HTTPException(
                 status_code=HTTPStatus.CONFLICT,
                 detail="Username or email already exists",
             )
 
+        invalidate_cached_user(cached_email)
+
+        return updated_user
+
     async def delete_user(self, user_id: int, current_user: User) -> bool:
         if current_user.id != user_id:
             raise HTTPException(
@@ -94,12 +434,14 @@ class UserService(BaseService[UserRepository]):
                 detail="Not enough permissions",
             )
 
-        user = await self.get_user_by_id(user_id)
+        deleted = await self._repository.delete_by_id(user_id)
+        invalidate_cached_user(current_user.email)
+        user_count_cache.invalidate("users")
 
-        if not user:
+        if not deleted:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail="User not found",
             )
 
-        return await self._repository.delete(user)
+        return deleted
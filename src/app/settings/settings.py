@@ -1,4 +1,10 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Annotated, Literal
+
+from pydantic import field_validator, model_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -10,3 +16,68 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    DATABASE_REPLICA_URLS: Annotated[list[str], NoDecode] = []
+    DATABASE_REPLICA_RETRY_SECONDS: float = 30
+
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_SLOW_CHECKOUT_MS: float = 100
+    DATABASE_PREPARE_THRESHOLD: int | None = 5
+    DATABASE_WARMUP_CONNECTIONS: int = 2
+
+    INTERNAL_API_TOKEN: str | None = None
+
+    PROFILE_DIR: str = str(Path(gettempdir()) / "user-manager-api-profiles")
+    PROFILE_MAX_REPORTS: int = 20
+
+    HASHING_EXECUTOR: Literal["thread", "process"] = "thread"
+    HASHING_MAX_WORKERS: int = 4
+    HASHING_MAX_QUEUE: int = 64
+
+    ARGON2_PARAMETERS_FILE: str | None = None
+    ARGON2_CALIBRATE: bool = False
+    ARGON2_TARGET_MS: float = 200
+    ARGON2_MAX_MEMORY_KIB: int = 64 * 1024
+    ARGON2_PARALLELISM: int = 4
+
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: float = 30
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+    USER_COUNT_CACHE_TTL_SECONDS: float = 10
+    USER_LOOKUP_MAX_IDS: int = 100
+
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 20
+    LOGIN_ACCOUNT_BURST: int = 5
+    LOGIN_ACCOUNT_PER_MINUTE: float = 5
+    LOGIN_MAX_CONCURRENT_VERIFICATIONS: int = 16
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    TRUSTED_PROXY_IPS: Annotated[list[str], NoDecode] = []
+
+    @field_validator(
+        "DATABASE_REPLICA_URLS", "TRUSTED_PROXY_IPS", mode="before"
+    )
+    @classmethod
+    def split_comma_separated(cls, value):
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(",") if item.strip()]
+
+        return value
+
+    @model_validator(mode="after")
+    def require_argon2_parameters_file(self):
+        if self.ARGON2_CALIBRATE and not self.ARGON2_PARAMETERS_FILE:
+            message = "ARGON2_CALIBRATE requires ARGON2_PARAMETERS_FILE"
+            raise ValueError(message)
+
+        return self
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -6,12 +6,12 @@ import factory
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import event
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 
 from src.app.app import app
-from src.app.database.connection import db_handler
+from src.app.database.connection import get_read_session, get_session
 from src.app.dependencies.dependencies import (
     get_auth_service,
     get_user_repository,
@@ -19,10 +19,16 @@ from src.app.dependencies.dependencies import (
 )
 from src.app.models.user import Base, User
 from src.app.repositories.user_repository import UserRepository
-from src.app.security.security import get_password_hash, verify_password
+from src.app.security.security import (
+    get_password_hash,
+    login_rate_limiter,
+    token_cache,
+    user_cache,
+    verify_password,
+)
 from src.app.services.auth_service import AuthService
-from src.app.services.user_service import UserService
-from src.app.settings.settings import Settings
+from src.app.services.user_service import UserService, user_count_cache
+from src.app.settings.settings import get_settings
 
 
 class UserFactory(factory.Factory):
@@ -31,6 +37,7 @@ class UserFactory(factory.Factory):
 
     username = factory.Sequence(lambda n: f"test{n}")
     email = factory.LazyAttribute(lambda obj: f"{obj.username}@test.com")
+    password = factory.LazyAttribute(lambda obj: f"{obj.username}+password")
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -58,8 +65,22 @@ async def session(engine):
         yield session
 
 
+def _clear_caches():
+    user_cache.clear()
+    token_cache.clear()
+    user_count_cache.clear()
+    login_rate_limiter.reset()
+
+
+@pytest.fixture
+def clear_caches():
+    _clear_caches()
+    yield
+    _clear_caches()
+
+
 @pytest.fixture
-def client(session):
+def client(session, clear_caches, monkeypatch):
     def get_session_override():
         return session
 
@@ -74,13 +95,18 @@ def client(session):
         user_repository = UserRepository(session)
         return UserService(user_repository)
 
-    app.dependency_overrides[db_handler.get_session] = get_session_override
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
     app.dependency_overrides[get_user_repository] = (
         get_user_repository_override
     )
     app.dependency_overrides[get_auth_service] = get_auth_service_override
     app.dependency_overrides[get_user_service] = get_user_service_override
 
+    # The app's own engine is never used by the tests, so startup skips
+    # warming it up.
+    monkeypatch.setattr(get_settings(), "DATABASE_WARMUP_CONNECTIONS", 0)
+
     with TestClient(app) as client:
         yield client
 
@@ -107,6 +133,25 @@ def mock_db_time():
     return _mock_db_time
 
 
+@pytest.fixture
+def record_statements(engine):
+    @contextmanager
+    def _record_statements():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    return _record_statements
+
+
 @pytest_asyncio.fixture
 async def user(session):
     password = "testtest"
@@ -145,6 +190,16 @@ async def other_user(session):
     return user
 
 
+@pytest_asyncio.fixture
+async def users(session, user):
+    session.add_all(UserFactory.create_batch(4))
+    await session.commit()
+
+    result = await session.scalars(select(User).order_by(User.id))
+
+    return result.all()
+
+
 @pytest.fixture
 def token(client, user):
     response = client.post(
@@ -165,7 +220,7 @@ def credentials_exception():
 
 @pytest.fixture
 def settings():
-    return Settings()
+    return get_settings()
 
 
 @pytest_asyncio.fixture
@@ -1,10 +1,14 @@
 from http import HTTPStatus
 
+import pytest
 from fastapi.testclient import TestClient
 from freezegun import freeze_time
+from sqlalchemy import select
 
 from src.app.models.user import User
 from src.app.schemas.schemas import Token
+from src.app.security.calibration import Argon2Parameters
+from src.app.security.security import pwd_context, settings
 
 
 def test_login_for_access_token(client: TestClient, user: User):
@@ -95,3 +99,86 @@ def test_token_expired_dont_refresh(client: TestClient, user: User):
 
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {"detail": "Could not validate credentials"}
+
+
+def test_login_email_is_case_insensitive(client: TestClient, user: User):
+    response = client.post(
+        "/auth/login",
+        data={
+            "username": user.email.upper(),
+            "password": user.plain_password,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_login_is_rate_limited_per_account(client: TestClient, user: User):
+    for _ in range(settings.LOGIN_ACCOUNT_BURST):
+        client.post(
+            "/auth/login",
+            data={"username": user.email, "password": "wrong_password"},
+        )
+
+    response = client.post(
+        "/auth/login",
+        data={"username": user.email.upper(), "password": user.plain_password},
+    )
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) > 0
+    assert response.json() == {
+        "detail": "Too many login attempts, try again later"
+    }
+
+
+@pytest.mark.parametrize(
+    ("trusted_proxies", "separate_buckets"),
+    [([], False), (["testclient", "10.0.0.0/8"], True)],
+)
+def test_login_ip_bucket_uses_forwarded_address_from_trusted_proxy(
+    client: TestClient, monkeypatch, trusted_proxies, separate_buckets
+):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_IPS", trusted_proxies)
+
+    def login(attempt, forwarded_for):
+        return client.post(
+            "/auth/login",
+            data={"username": f"nobody{attempt}@test.com", "password": "x"},
+            headers={"X-Forwarded-For": forwarded_for},
+        )
+
+    for attempt in range(settings.LOGIN_IP_BURST):
+        login(attempt, f"198.51.100.1, 10.0.0.{attempt}")
+
+    response = login("last", "203.0.113.9, 10.0.0.1")
+
+    assert (response.status_code != HTTPStatus.TOO_MANY_REQUESTS) is (
+        separate_buckets
+    )
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password_hash(
+    client: TestClient, session, user: User
+):
+    legacy_hash = (
+        Argon2Parameters(time_cost=1, memory_cost=8192, parallelism=1)
+        .hasher()
+        .hash(user.plain_password)
+    )
+    user.password = legacy_hash
+    await session.commit()
+
+    response = client.post(
+        "/auth/login",
+        data={"username": user.email, "password": user.plain_password},
+    )
+    stored_hash = await session.scalar(
+        select(User.password).where(User.id == user.id)
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert stored_hash != legacy_hash
+    assert not pwd_context.current_hasher.check_needs_rehash(stored_hash)
+    assert pwd_context.verify(user.plain_password, stored_hash)
@@ -1,7 +1,20 @@
+from http import HTTPStatus
+
+import factory
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, exc, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from src.app.models.user import User
+from src.app.app import app, warm_up
+from src.app.database.connection import get_session
+from src.app.database.database import DBConnectionHandler
+from src.app.database.pool import InstrumentedAsyncQueuePool
+from src.app.models.user import Base, User
+from src.app.repositories.user_repository import UserRepository
+from src.app.security.security import settings
+from src.app.services.user_service import UserService
+from src.app.settings.settings import Settings
+from tests.conftest import UserFactory
 
 
 @pytest.mark.asyncio
@@ -23,3 +36,395 @@ async def test_create_user(session, mock_db_time):
         "created_at": time,
         "updated_at": time,
     }
+
+
+@pytest.mark.asyncio
+async def test_pool_telemetry_records_checkouts_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect().start()
+
+        snapshot = engine.pool.telemetry.snapshot(engine.pool)
+
+    await engine.dispose()
+
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checked_out"] == 1
+    assert snapshot["idle"] == 0
+
+
+def test_pool_status_requires_internal_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal")
+
+    response = client.get(
+        "/internal/db/pool", headers={"X-Internal-Token": "wrong"}
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert response.json() == {"detail": "Not enough permissions"}
+
+
+def test_pool_status(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal")
+
+    response = client.get(
+        "/internal/db/pool", headers={"X-Internal-Token": "internal"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert "pool_class" in response.json()
+    assert "wait_seconds_max" in response.json()
+
+
+def test_read_engine_round_robin_and_fallback(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path}/p.db")
+    monkeypatch.setenv(
+        "DATABASE_REPLICA_URLS",
+        f"sqlite+aiosqlite:///{tmp_path}/r1.db,"
+        f"sqlite+aiosqlite:///{tmp_path}/r2.db",
+    )
+    handler = DBConnectionHandler(Settings())
+    first, second = handler.get_replica_engines()
+
+    assert [handler.get_read_engine() for _ in range(3)] == [
+        first,
+        second,
+        first,
+    ]
+
+    handler.mark_replica_unhealthy(0)
+    assert handler.get_read_engine() is second
+
+    handler.mark_replica_unhealthy(1)
+    assert handler.get_read_engine() is handler.get_engine()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fills_every_pool_and_dispose_empties_it(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path}/p.db")
+    monkeypatch.setenv(
+        "DATABASE_REPLICA_URLS", f"sqlite+aiosqlite:///{tmp_path}/r1.db"
+    )
+    handler = DBConnectionHandler(Settings())
+    engines = [handler.get_engine(), *handler.get_replica_engines()]
+
+    await handler.warm_up(3)
+    warmed = [engine.pool.checkedin() for engine in engines]
+
+    await handler.dispose()
+
+    assert warmed == [3, 3]
+    assert [engine.pool.checkedin() for engine in engines] == [0, 0]
+
+
+@pytest.mark.asyncio
+async def test_startup_warm_up_primes_primary_and_replicas(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path}/p.db")
+    monkeypatch.setenv(
+        "DATABASE_REPLICA_URLS", f"sqlite+aiosqlite:///{tmp_path}/r1.db"
+    )
+    handler = DBConnectionHandler(Settings())
+    engines = [handler.get_engine(), *handler.get_replica_engines()]
+    selects = {engine: [] for engine in engines}
+
+    for engine in engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args, engine=engine: (
+                selects[engine].append(statement)
+            ),
+        )
+
+    await warm_up(handler, 2)
+    warmed = [engine.pool.checkedin() for engine in engines]
+    await handler.dispose()
+
+    assert warmed == [2, 2]
+    assert all(
+        any(statement.startswith("SELECT") for statement in statements)
+        for statements in selects.values()
+    )
+
+
+@pytest.mark.asyncio
+async def test_repository_reads_from_replica(session, engine):
+    replica_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(replica_engine) as replica_session:
+        replica_session.add(UserFactory(username="replica"))
+        await replica_session.commit()
+
+        repository = UserRepository(session, replica_session)
+        replica_users = await repository.get_all()
+
+        await repository.create(
+            factory.build(dict, FACTORY_CLASS=UserFactory, username="primary")
+        )
+        primary_users = await repository.get_all()
+
+    await replica_engine.dispose()
+
+    assert [user.username for user in replica_users] == ["replica"]
+    assert [user.username for user in primary_users] == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_repository_falls_back_to_primary(session, user, tmp_path):
+    broken_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db"
+    )
+
+    async with AsyncSession(broken_engine) as replica_session:
+        repository = UserRepository(session, replica_session)
+        users = await repository.get_all()
+
+    await broken_engine.dispose()
+
+    assert [found.username for found in users] == [user.username]
+
+
+@pytest.mark.asyncio
+async def test_repository_raises_sql_errors_from_replica(session, user):
+    replica_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+    async with AsyncSession(replica_engine) as replica_session:
+        repository = UserRepository(session, replica_session)
+
+        with pytest.raises(exc.OperationalError, match="no such table"):
+            await repository.get_all()
+
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_only_connection_errors_mark_replica_unhealthy(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path}/p.db")
+    monkeypatch.setenv(
+        "DATABASE_REPLICA_URLS",
+        f"sqlite+aiosqlite:///{tmp_path}/r1.db,"
+        f"sqlite+aiosqlite:///{tmp_path}/missing/r2.db",
+    )
+    handler = DBConnectionHandler(Settings())
+
+    for engine in handler.get_replica_engines():
+        with pytest.raises(exc.OperationalError):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT * FROM missing_table"))
+
+    replicas = handler.pool_status()["replicas"]
+    await handler.dispose()
+
+    assert [replica["healthy"] for replica in replicas] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_export_closes_the_replica_session(session, user):
+    replica_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(replica_engine) as replica_session:
+        service = UserService(UserRepository(session, replica_session))
+        chunks = [chunk async for chunk in service.export_users("csv")]
+        replica_in_transaction = replica_session.in_transaction()
+
+    await replica_engine.dispose()
+
+    assert chunks == ["id,username,email\r\n"]
+    assert not replica_in_transaction
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("values", "field"),
+    [
+        ({"username": "other", "email": "testuser@test.com"}, "email"),
+        ({"username": "other", "email": "TESTUSER@test.com"}, "email"),
+        ({"username": "testuser", "email": "other@test.com"}, "username"),
+        ({"username": "other", "email": "other@test.com"}, None),
+    ],
+)
+async def test_get_conflicting_field(session, user, values, field):
+    password = None if field is None else "secret"
+
+    with pytest.raises(exc.IntegrityError) as exc_info:
+        await UserRepository(session).create({**values, "password": password})
+
+    assert UserRepository.get_conflicting_field(exc_info.value) == field
+
+
+@pytest.mark.asyncio
+async def test_repository_count(session, users):
+    repository = UserRepository(session)
+
+    assert await repository.count() == len(users)
+    assert await repository.count(username=users[0].username) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        ({"email": "testuser@test.com"}, True),
+        ({"email": "missing@test.com"}, False),
+        ({}, False),
+    ],
+)
+async def test_repository_exists(session, user, filters, expected):
+    repository = UserRepository(session)
+    session.expunge_all()
+
+    assert await repository.exists(**filters) is expected
+    assert not session.identity_map
+
+
+@pytest.mark.asyncio
+async def test_repository_find_columns_does_not_load_models(session, user):
+    repository = UserRepository(session)
+    session.expunge_all()
+
+    rows = await repository.find_columns(["id", "email"], email=user.email)
+
+    assert rows == [(user.id, user.email)]
+    assert not session.identity_map
+
+
+@pytest.mark.asyncio
+async def test_email_lookup_uses_lower_email_index(session, user):
+    query = select(User).where(UserRepository.email_equals(user.email))
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+
+    plan = await session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+
+    assert any("ix_users_email_lower" in row.detail for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_get_by_email_is_case_insensitive(session, user):
+    repository = UserRepository(session)
+
+    found = await repository.get_by_email(user.email.upper())
+
+    assert found.id == user.id
+
+
+@pytest.fixture
+def checkouts(client, engine):
+    async def get_session_per_request():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides = {get_session: get_session_per_request}
+    checkouts = []
+
+    def record(*args):
+        checkouts.append(args)
+
+    event.listen(engine.sync_engine, "checkout", record)
+
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine.sync_engine, "checkout", record)
+
+
+@pytest.mark.parametrize(
+    "request_line",
+    [
+        "GET /users/{user_id}",
+        "GET /users",
+        "PUT /users/{user_id}",
+        "POST /auth/refresh_token",
+    ],
+)
+def test_authenticated_request_checks_out_one_connection(
+    client, user, token, checkouts, request_line
+):
+    method, path = request_line.split()
+
+    response = client.request(
+        method,
+        path.format(user_id=user.id),
+        headers={"Authorization": f"Bearer {token}"},
+        json={"username": "new", "email": "new@new.com", "password": "x"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(checkouts) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_uses_the_dialect_of_the_reading_session():
+    replica_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(replica_engine) as replica_session:
+        replica_session.add(UserFactory(username="joanna"))
+        await replica_session.commit()
+
+        repository = UserRepository(AsyncSession(), replica_session)
+        rows = await repository.search("anna")
+
+    await replica_engine.dispose()
+
+    assert [row.username for row in rows] == ["joanna"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("clear_caches")
+async def test_exact_user_count_reads_the_primary(session, user):
+    replica_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(replica_engine) as replica_session:
+        service = UserService(UserRepository(session, replica_session))
+        total = await service.count_users("exact")
+
+    await replica_engine.dispose()
+
+    assert total == (1, "exact")
+
+
+@pytest.mark.asyncio
+async def test_create_all_is_idempotent(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite")
+
+    for _ in range(2):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        session.add(UserFactory())
+        await session.commit()
+        total = await UserRepository(session).get_maintained_count()
+
+    await engine.dispose()
+
+    assert total == 1
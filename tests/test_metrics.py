@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from src.app.metrics.metrics import Histogram, instrument_engine
+from src.app.models.user import User
+from src.app.security.security import settings
+
+
+def test_histogram_render():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 2',
+        'latency_seconds_sum{route="/a"} 0.55',
+        'latency_seconds_count{route="/a"} 2',
+    ]
+
+
+def test_metrics_requires_internal_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal")
+
+    assert client.get("/metrics").status_code == HTTPStatus.FORBIDDEN
+    assert (
+        client.get("/metrics", headers={"X-Internal-Token": "wrong"})
+    ).status_code == HTTPStatus.FORBIDDEN
+
+
+def test_metrics_endpoint(
+    client: TestClient, user: User, token, engine, monkeypatch
+):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal")
+    instrument_engine(engine)
+    client.get(
+        f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    response = client.get("/metrics", headers={"X-Internal-Token": "internal"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/users/{user_id}",status="200"}'
+    ) in response.text
+    assert 'db_query_duration_seconds_count{operation="SELECT"}' in (
+        response.text
+    )
+    assert (
+        "password_hashing_duration_seconds_count"
+        '{operation="verify_and_update_password"}'
+    ) in response.text
+    assert "user_cache_hits" in response.text
+    assert "db_pool_checkouts" in response.text
@@ -0,0 +1,136 @@
+import asyncio
+import cProfile
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.models.user import User
+from src.app.profiling.middleware import ProfilingMiddleware
+from src.app.profiling.profiler import ProfileStore, profile_store
+from src.app.security.security import settings
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal")
+    monkeypatch.setattr(profile_store, "directory", tmp_path)
+
+    return profile_store
+
+
+def test_request_is_not_profiled_without_header(
+    client: TestClient, user: User, token, profiles
+):
+    response = client.get(
+        f"/users/{user.id}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "X-Internal-Token": "internal",
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert "x-profile-id" not in response.headers
+    assert profiles.list_reports() == []
+
+
+def test_profile_header_requires_internal_token(
+    client: TestClient, user: User, token, profiles
+):
+    response = client.get(
+        f"/users/{user.id}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "X-Profile": "1",
+            "X-Internal-Token": "wrong",
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert "x-profile-id" not in response.headers
+    assert profiles.list_reports() == []
+
+
+def test_profiled_request_report(
+    client: TestClient, user: User, token, profiles
+):
+    headers = {"X-Internal-Token": "internal"}
+
+    response = client.get(
+        f"/users/{user.id}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "X-Profile": "1",
+            **headers,
+        },
+    )
+    profile_id = response.headers["x-profile-id"]
+
+    listing = client.get("/internal/profiles", headers=headers).json()
+    report = client.get(
+        f"/internal/profiles/{profile_id}?limit=500", headers=headers
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert listing[0]["id"] == profile_id
+    assert listing[0]["route"] == "/users/{user_id}"
+    assert report.status_code == HTTPStatus.OK
+    assert "get_user_by_id" in report.text
+
+
+@pytest.mark.asyncio
+async def test_profile_counts_overlapping_requests(profiles):
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/slow":
+            await release.wait()
+
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    def request(path, headers=()):
+        scope = {"type": "http", "method": "GET", "path": path}
+        return middleware({**scope, "headers": list(headers)}, None, send)
+
+    middleware = ProfilingMiddleware(app, store=profiles)
+    headers = [(b"x-profile", b"1"), (b"x-internal-token", b"internal")]
+    profiled = asyncio.create_task(request("/slow", headers))
+    await asyncio.sleep(0)
+
+    overlapping = [request("/fast"), request("/fast")]
+    await asyncio.gather(*overlapping)
+    release.set()
+    await profiled
+
+    [report] = profiles.list_reports()
+
+    assert report["path"] == "/slow"
+    assert report["overlapping_requests"] == len(overlapping)
+
+
+def test_profile_not_found(client: TestClient, profiles):
+    response = client.get(
+        "/internal/profiles/../../etc/passwd",
+        headers={"X-Internal-Token": "internal"},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_profile_store_keeps_most_recent_reports(tmp_path):
+    store = ProfileStore(tmp_path, max_reports=2)
+    profile_ids = [store.new_id() for _ in range(3)]
+
+    for profile_id in profile_ids:
+        store.save(profile_id, cProfile.Profile(), {})
+
+    assert [report["id"] for report in store.list_reports()] == [
+        profile_ids[2],
+        profile_ids[1],
+    ]
+    assert store.report(profile_ids[0]) is None
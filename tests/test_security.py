@@ -1,8 +1,34 @@
+import asyncio
+import threading
+import time
 from http import HTTPStatus
 
+import pytest
+from fastapi import HTTPException
+from freezegun import freeze_time
 from jwt import decode
+from pydantic import ValidationError
 
-from src.app.security.security import create_access_token
+from src.app.security import security
+from src.app.security.cache import TTLCache
+from src.app.security.calibration import Argon2Parameters, calibrate_argon2
+from src.app.security.hashing import PasswordHashingPool
+from src.app.security.rate_limit import (
+    InMemoryRateLimitBackend,
+    LoginRateLimiter,
+)
+from src.app.security.security import (
+    configure_password_hashing,
+    create_access_token,
+    decode_access_token,
+    get_password_hash,
+    get_password_hash_async,
+    pwd_context,
+    token_cache,
+    user_cache,
+    verify_password_async,
+)
+from src.app.settings.settings import Settings
 
 
 def test_jwt(settings):
@@ -57,3 +83,266 @@ def test_get_current_user_does_not_exists(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {"detail": "Could not validate credentials"}
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async():
+    hashed = await get_password_hash_async("secret")
+
+    assert await verify_password_async("secret", hashed)
+    assert not await verify_password_async("wrong", hashed)
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_queue_is_full():
+    pool = PasswordHashingPool(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    running = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(time.sleep, 0)
+
+    release.set()
+    await running
+    pool.shutdown()
+
+    stats = pool.stats()
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert stats["completed"] == 1
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_batches_leave_a_worker_for_single_calls():
+    workers = 3
+    pool = PasswordHashingPool(max_workers=workers, max_queue=0)
+    release = threading.Event()
+
+    batches = [
+        asyncio.create_task(pool.map(release.wait, [None] * 4))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0.05)
+    busy = pool.stats()["in_flight"]
+
+    login = await pool.run(time.sleep, 0)
+
+    release.set()
+    await asyncio.gather(*batches)
+    pool.shutdown()
+
+    assert busy == workers - 1
+    assert login is None
+    assert pool.stats()["rejected"] == 0
+
+
+def test_get_current_user_is_cached(client, user, token):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.get(f"/users/{user.id}", headers=headers)
+    client.get(f"/users/{user.id}", headers=headers)
+
+    assert user_cache.stats()["misses"] == 1
+    assert user_cache.stats()["hits"] == 1
+
+
+def test_user_cache_is_invalidated_on_update(client, user, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get(f"/users/{user.id}", headers=headers)
+
+    client.put(
+        f"/users/{user.id}",
+        headers=headers,
+        json={
+            "username": "renamed",
+            "email": "renamed@test.com",
+            "password": "secret",
+        },
+    )
+    response = client.get(f"/users/{user.id}", headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_user_cache_is_invalidated_on_delete(client, user, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get(f"/users/{user.id}", headers=headers)
+
+    client.delete(f"/users/{user.id}", headers=headers)
+    response = client.get(f"/users/{user.id}", headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    with freeze_time("2025-08-13 12:00:00"):
+        cache.set("a", 1)
+
+    with freeze_time("2025-08-13 12:01:01"):
+        assert cache.get("a") is None
+
+
+@pytest.mark.usefixtures("clear_caches")
+def test_decode_access_token_is_memoized(user):
+    token = create_access_token({"sub": user.email})
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert first == second
+    assert token_cache.stats()["misses"] == 1
+    assert token_cache.stats()["hits"] == 1
+
+
+def test_memoized_token_is_evicted_at_exp(client, user):
+    with freeze_time("2025-08-13 12:00:00"):
+        token = create_access_token({"sub": user.email})
+        decode_access_token(token)
+
+    with freeze_time("2025-08-13 12:31:00"):
+        response = client.get(
+            f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert token_cache.get(token) is None
+
+
+def test_token_bucket_refills_over_time():
+    backend = InMemoryRateLimitBackend(shards=2)
+
+    with freeze_time("2025-08-13 12:00:00"):
+        assert backend.acquire("key", capacity=2, refill_rate=1) == 0
+        assert backend.acquire("key", capacity=2, refill_rate=1) == 0
+        assert backend.acquire("key", capacity=2, refill_rate=1) == 1
+
+    with freeze_time("2025-08-13 12:00:01"):
+        assert backend.acquire("key", capacity=2, refill_rate=1) == 0
+
+
+def test_rate_limit_backend_bounds_tracked_keys():
+    backend = InMemoryRateLimitBackend(shards=1, max_keys=2)
+
+    for key in ("a", "b", "c"):
+        backend.acquire(key, capacity=1, refill_rate=1)
+
+    assert backend.acquire("a", capacity=1, refill_rate=1) == 0
+    assert backend.acquire("c", capacity=1, refill_rate=1) > 0
+
+
+def test_login_rate_limiter_throttles_per_ip():
+    limiter = LoginRateLimiter(
+        InMemoryRateLimitBackend(),
+        ip_limit=(1, 1),
+        account_limit=(10, 10),
+        max_concurrent=1,
+    )
+    limiter.check("10.0.0.1", "a@test.com")
+
+    with pytest.raises(HTTPException) as exc_info:
+        limiter.check("10.0.0.1", "b@test.com")
+
+    limiter.check("10.0.0.2", "b@test.com")
+
+    assert exc_info.value.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert exc_info.value.headers == {"Retry-After": "60"}
+    assert limiter.stats()["throttled_ip"] == 1
+
+
+@pytest.mark.asyncio
+async def test_login_rate_limiter_rejects_over_concurrency_cap():
+    limiter = LoginRateLimiter(
+        InMemoryRateLimitBackend(),
+        ip_limit=(1, 1),
+        account_limit=(1, 1),
+        max_concurrent=1,
+    )
+
+    async with limiter.admit():
+        with pytest.raises(HTTPException) as exc_info:
+            async with limiter.admit():
+                pass
+
+    async with limiter.admit():
+        pass
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert limiter.stats() == {
+        "in_flight": 0,
+        "max_concurrent": 1,
+        "throttled_ip": 0,
+        "throttled_account": 0,
+        "rejected": 1,
+    }
+
+
+def test_calibrate_argon2_stays_within_target():
+    target_ms, max_memory_cost = 50, 4096
+
+    parameters, measured_ms = calibrate_argon2(
+        target_ms,
+        max_memory_cost=max_memory_cost,
+        min_memory_cost=1024,
+        parallelism=1,
+    )
+
+    assert parameters.memory_cost <= max_memory_cost
+    assert parameters.time_cost >= 1
+    assert parameters.parallelism == 1
+    assert 0 < measured_ms <= target_ms
+
+
+def test_argon2_parameters_are_persisted(tmp_path):
+    path = str(tmp_path / "argon2.json")
+    parameters = Argon2Parameters(time_cost=2, memory_cost=1024, parallelism=1)
+
+    parameters.save(path, measured_ms=12.5)
+
+    assert Argon2Parameters.load(path) == parameters
+    assert Argon2Parameters.load(str(tmp_path / "missing.json")) is None
+
+
+def test_calibration_requires_parameters_file(monkeypatch):
+    monkeypatch.setenv("ARGON2_CALIBRATE", "true")
+    monkeypatch.delenv("ARGON2_PARAMETERS_FILE", raising=False)
+
+    with pytest.raises(ValidationError, match="ARGON2_PARAMETERS_FILE"):
+        Settings()
+
+
+@pytest.mark.asyncio
+async def test_configured_parameters_reach_hashing_workers(monkeypatch):
+    pool = PasswordHashingPool(executor="process", max_workers=1)
+    monkeypatch.setattr(security, "hashing_pool", pool)
+    monkeypatch.setattr(pwd_context, "hashers", pwd_context.hashers)
+    monkeypatch.setattr(
+        pwd_context, "current_hasher", pwd_context.current_hasher
+    )
+    parameters = Argon2Parameters(time_cost=1, memory_cost=8192, parallelism=1)
+
+    try:
+        await pool.run(get_password_hash, "secret")
+        configure_password_hashing(parameters)
+        hashed = await pool.run(get_password_hash, "secret")
+    finally:
+        pool.shutdown()
+
+    assert "$m=8192,t=1,p=1$" in hashed
@@ -1,9 +1,25 @@
+import csv
+import io
+import json
+from datetime import datetime
 from http import HTTPStatus
 
+import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import update
 
 from src.app.models.user import User
-from src.app.schemas.schemas import Token, UserPublic
+from src.app.repositories.user_repository import UserRepository
+from src.app.schemas.schemas import (
+    FilterPage,
+    Token,
+    UserPatch,
+    UserPublic,
+    UserSchema,
+)
+from src.app.security.security import hashing_pool
+from src.app.services.user_service import UserService
 
 
 def test_create_user(client: TestClient):
@@ -150,3 +166,601 @@ def test_delete_user_without_permissions(
 
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {"detail": "Not enough permissions"}
+
+
+@pytest.mark.parametrize("order_by", ["id", "created_at"])
+def test_read_users_with_cursor(
+    client: TestClient, users: list[User], token: Token, order_by: str
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"pagination": "cursor", "order_by": order_by, "limit": 2}
+    pages = []
+
+    while True:
+        response = client.get("/users", headers=headers, params=params)
+        data = response.json()
+
+        assert response.status_code == HTTPStatus.OK
+        pages.append([item["id"] for item in data["users"]])
+
+        if "next_cursor" not in data:
+            break
+
+        params = {"cursor": data["next_cursor"], "limit": 2}
+
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+def test_read_users_with_invalid_cursor(client: TestClient, token: Token):
+    response = client.get(
+        "/users",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"cursor": "not-a-cursor"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_create_users_bulk(client: TestClient, user: User, token: Token):
+    response = client.post(
+        "/users/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json=[
+            {"username": "ana", "email": "ana@example.com", "password": "a"},
+            {"username": "bia", "email": user.email, "password": "b"},
+            {"username": user.username, "email": "c@c.com", "password": "c"},
+            {"username": "ana", "email": "dup@example.com", "password": "d"},
+            {"username": "edu", "email": "edu@example.com", "password": "e"},
+        ],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "created": [
+            {"id": 2, "username": "ana", "email": "ana@example.com"},
+            {"id": 3, "username": "edu", "email": "edu@example.com"},
+        ],
+        "errors": [
+            {"index": 1, "detail": "Email already exists"},
+            {"index": 2, "detail": "Username already exists"},
+            {"index": 3, "detail": "Username already exists"},
+        ],
+    }
+
+
+def test_create_users_bulk_reports_insert_time_conflicts(
+    client: TestClient, user: User, token: Token, monkeypatch
+):
+    async def nothing_taken(self, emails, usernames):
+        return set(), set()
+
+    monkeypatch.setattr(
+        UserRepository, "get_taken_emails_and_usernames", nothing_taken
+    )
+
+    response = client.post(
+        "/users/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json=[
+            {"username": "ana", "email": "ana@example.com", "password": "a"},
+            {"username": "bia", "email": user.email, "password": "b"},
+            {"username": user.username, "email": "c@c.com", "password": "c"},
+            {"username": "edu", "email": "edu@example.com", "password": "e"},
+        ],
+    )
+    listed = client.get(
+        "/users/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "created": [
+            {"id": 2, "username": "ana", "email": "ana@example.com"},
+            {"id": 3, "username": "edu", "email": "edu@example.com"},
+        ],
+        "errors": [
+            {"index": 1, "detail": "Email already exists"},
+            {"index": 2, "detail": "Username already exists"},
+        ],
+    }
+    assert [row["username"] for row in listed.json()["users"]] == [
+        user.username,
+        "ana",
+        "edu",
+    ]
+
+
+def test_create_users_bulk_hashes_passwords(client: TestClient, token: Token):
+    client.post(
+        "/users/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json=[{"username": "ana", "email": "ana@ana.com", "password": "a1"}],
+    )
+
+    response = client.post(
+        "/auth/login", data={"username": "ana@ana.com", "password": "a1"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_export_users_ndjson(client: TestClient, users: list[User], token):
+    response = client.get(
+        "/users/export", headers={"Authorization": f"Bearer {token}"}
+    )
+    lines = response.text.splitlines()
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in lines] == [
+        {"id": user.id, "username": user.username, "email": user.email}
+        for user in users
+    ]
+
+
+def test_export_users_csv(client: TestClient, users: list[User], token):
+    response = client.get(
+        "/users/export",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"format": "csv"},
+    )
+    rows = list(csv.reader(io.StringIO(response.text)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert rows[0] == ["id", "username", "email"]
+    assert rows[1:] == [
+        [str(user.id), user.username, user.email] for user in users
+    ]
+
+
+def test_create_user_issues_a_single_statement(
+    client: TestClient, record_statements
+):
+    with record_statements() as statements:
+        response = client.post(
+            "/users",
+            json={
+                "username": "rani",
+                "email": "rani@rani.com",
+                "password": "x",
+            },
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO users")
+    assert "RETURNING" in statements[0]
+
+
+@pytest.mark.parametrize(
+    ("method", "expected_statement"),
+    [("put", "UPDATE users"), ("delete", "DELETE FROM users")],
+)
+def test_write_endpoints_issue_a_single_write(
+    client: TestClient,
+    token: Token,
+    record_statements,
+    method: str,
+    expected_statement: str,
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/users/1", headers=headers)
+
+    with record_statements() as statements:
+        response = client.request(
+            method,
+            "/users/1",
+            headers=headers,
+            json={"username": "new", "email": "new@new.com", "password": "x"},
+        )
+
+    writes = [s for s in statements if not s.startswith("SELECT")]
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(writes) == 1
+    assert writes[0].startswith(expected_statement)
+    assert "RETURNING" in writes[0]
+
+
+def test_create_user_email_differs_only_by_case(client: TestClient, user):
+    response = client.post(
+        "/users",
+        json={
+            "username": "rani",
+            "email": user.email.upper(),
+            "password": "secret",
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {"detail": "Email already exists"}
+
+
+def test_read_user_by_id_not_modified(
+    client: TestClient, user: User, token: Token, record_statements
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    etag = client.get(f"/users/{user.id}", headers=headers).headers["ETag"]
+
+    with record_statements() as statements:
+        response = client.get(
+            f"/users/{user.id}", headers={**headers, "If-None-Match": etag}
+        )
+
+    assert etag.startswith('W/"')
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT users.id, users.username")
+    assert "users.password" not in statements[0]
+
+
+def test_read_user_by_id_with_stale_etag(
+    client: TestClient, user: User, token: Token
+):
+    response = client.get(
+        f"/users/{user.id}",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "If-None-Match": 'W/"stale"',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["id"] == user.id
+
+
+@pytest.mark.asyncio
+async def test_user_etag_follows_updated_at(session, user):
+    service = UserService(UserRepository(session))
+    etag = await service.get_user_etag(user.id)
+
+    await session.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(updated_at=datetime(2030, 1, 1))
+    )
+    await session.commit()
+
+    assert await service.get_user_etag(user.id) != etag
+    assert await service.get_user_etag(999) is None
+
+
+@pytest.mark.asyncio
+async def test_user_etag_changes_within_the_same_second(session, user):
+    repository = UserRepository(session)
+    service = UserService(repository)
+    frozen = {"updated_at": datetime(2030, 1, 1)}
+    await repository.update_by_id(user.id, frozen)
+    etag = await service.get_user_etag(user.id)
+
+    await repository.update_by_id(user.id, {**frozen, "username": "renamed"})
+
+    assert await service.get_user_etag(user.id) != etag
+
+
+@pytest.mark.parametrize("params", [{}, {"pagination": "cursor"}])
+def test_read_users_not_modified_until_page_changes(
+    client: TestClient, users: list[User], token: Token, params: dict
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {**params, "limit": 10}
+    etag = client.get("/users", headers=headers, params=params).headers["ETag"]
+
+    not_modified = client.get(
+        "/users", headers={**headers, "If-None-Match": etag}, params=params
+    )
+    client.post(
+        "/users",
+        json={"username": "new", "email": "new@new.com", "password": "x"},
+    )
+    modified = client.get(
+        "/users", headers={**headers, "If-None-Match": etag}, params=params
+    )
+
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert modified.status_code == HTTPStatus.OK
+    assert modified.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_get_users_returns_rows_serialized_without_models(
+    session, users
+):
+    service = UserService(UserRepository(session))
+    rows = await service.get_users(FilterPage(limit=2))
+
+    assert not any(isinstance(row, User) for row in rows)
+    assert service.to_public(rows) == [
+        UserPublic.model_validate(user).model_dump() for user in users[:2]
+    ]
+
+
+def test_patch_user_writes_only_changed_columns(
+    client: TestClient, user: User, token: Token, record_statements
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get(f"/users/{user.id}", headers=headers)
+
+    with record_statements() as statements:
+        response = client.patch(
+            f"/users/{user.id}",
+            headers=headers,
+            json={"username": "arthur", "email": user.email},
+        )
+
+    updates = [s for s in statements if s.startswith("UPDATE")]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "id": user.id,
+        "username": "arthur",
+        "email": user.email,
+    }
+    assert len(updates) == 1
+    assert updates[0].startswith("UPDATE users SET username=?, updated_at=")
+
+
+def test_put_user_without_changes_skips_hashing_and_the_write(
+    client: TestClient, user: User, token: Token, record_statements
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get(f"/users/{user.id}", headers=headers)
+    hashed = hashing_pool.stats()["submitted"]
+
+    with record_statements() as statements:
+        response = client.put(
+            f"/users/{user.id}",
+            headers=headers,
+            json={
+                "username": user.username,
+                "email": user.email,
+                "password": user.plain_password,
+            },
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["username"] == user.username
+    assert hashing_pool.stats()["submitted"] == hashed + 1
+    assert [statement.split()[0] for statement in statements] == ["SELECT"]
+
+
+@pytest.mark.asyncio
+async def test_update_compares_against_the_primary_not_the_cached_user(
+    session, user
+):
+    service = UserService(UserRepository(session))
+    stale_user = User(**user.to_dict())
+    await session.execute(
+        update(User).where(User.id == user.id).values(username="changed")
+    )
+    await session.commit()
+
+    updated = await service.patch_user(
+        user.id, UserPatch(username=stale_user.username), stale_user
+    )
+    await session.refresh(user)
+
+    assert updated.username == stale_user.username
+    assert user.username == stale_user.username
+
+
+def test_patch_user_password(client: TestClient, user: User, token: Token):
+    response = client.patch(
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"password": "new-password"},
+    )
+    login = client.post(
+        "/auth/login",
+        data={"username": user.email, "password": "new-password"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert login.status_code == HTTPStatus.OK
+
+
+def test_patch_user_conflict(
+    client: TestClient, user: User, other_user: User, token: Token
+):
+    response = client.patch(
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"email": other_user.email},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {"detail": "Username or email already exists"}
+
+
+@pytest_asyncio.fixture
+async def search_users(session):
+    users = [
+        User(username=name, email=f"{name}@search.com", password="secret")
+        for name in ("joanna", "anna", "bob", "ann")
+    ]
+    session.add_all(users)
+    await session.commit()
+
+    return users
+
+
+@pytest.mark.usefixtures("search_users")
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("ann", ["ann", "anna", "joanna"]),
+        ("ANN", ["ann", "anna", "joanna"]),
+        ("an", ["anna", "ann", "joanna"]),
+        ("@search.com", ["joanna", "anna", "bob", "ann"]),
+        ("_", []),
+    ],
+)
+def test_search_users_ranks_exact_prefix_then_substring(
+    client: TestClient, token: Token, query: str, expected: list[str]
+):
+    response = client.get(
+        "/users/search",
+        params={"q": query},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [user["username"] for user in response.json()["users"]] == expected
+
+
+@pytest.mark.usefixtures("search_users")
+def test_search_users_pages_with_cursor(client: TestClient, token: Token):
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"q": "ann", "limit": 1}
+    usernames = []
+
+    while True:
+        page = client.get("/users/search", params=params, headers=headers)
+        usernames.extend(user["username"] for user in page.json()["users"])
+
+        if "next_cursor" not in page.json():
+            break
+        params["cursor"] = page.json()["next_cursor"]
+
+    assert usernames == ["ann", "anna", "joanna"]
+
+    response = client.get(
+        "/users", params={"cursor": params["cursor"]}, headers=headers
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_search_users_follows_username_changes(session, search_users):
+    repository = UserRepository(session)
+    await repository.update_by_id(
+        search_users[2].id,
+        {"username": "annette", "email": "annette@search.com"},
+    )
+
+    rows = await repository.search("annet")
+
+    assert [row.username for row in rows] == ["annette"]
+    assert await repository.search("bob") == []
+
+
+@pytest.mark.parametrize(
+    ("include_total", "total_mode"),
+    [("exact", "exact"), ("estimate", "exact"), ("counter", "counter")],
+)
+def test_read_users_include_total(
+    client: TestClient,
+    users: list[User],
+    token: Token,
+    include_total: str,
+    total_mode: str,
+):
+    limit = 2
+    response = client.get(
+        "/users/",
+        params={"limit": limit, "include_total": include_total},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()["users"]) == limit
+    assert response.json()["total"] == len(users)
+    assert response.json()["total_mode"] == total_mode
+
+
+def test_read_users_without_total_omits_it(
+    client: TestClient, user: User, token: Token
+):
+    response = client.get(
+        "/users/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert "total" not in response.json()
+    assert "total_mode" not in response.json()
+
+
+def test_read_users_caches_exact_total(
+    client: TestClient, user: User, token: Token, record_statements
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"include_total": "exact"}
+    client.get("/users/", params=params, headers=headers)
+
+    with record_statements() as statements:
+        response = client.get("/users/", params=params, headers=headers)
+
+    assert response.json()["total"] == 1
+    assert not any("count(" in statement for statement in statements)
+
+
+@pytest.mark.asyncio
+async def test_user_counter_follows_creates_and_deletes(session, users):
+    repository = UserRepository(session)
+    service = UserService(repository)
+    created = await service.create_users([
+        UserSchema(username=f"counted{i}", email=f"c{i}@x.com", password="p")
+        for i in range(3)
+    ])
+    await repository.delete_by_id(users[0].id)
+
+    assert await service.count_users("counter") == (
+        len(users) + len(created["created"]) - 1,
+        "counter",
+    )
+    assert await service.count_users("exact") == (
+        await repository.count(),
+        "exact",
+    )
+
+
+def test_lookup_users_keeps_order_and_reports_missing(
+    client: TestClient, users: list[User], token: Token, record_statements
+):
+    missing_id = users[-1].id + 100
+    ids = [users[2].id, missing_id, users[0].id, users[2].id]
+
+    with record_statements() as statements:
+        response = client.post(
+            "/users/lookup",
+            json={"ids": ids},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "users": [
+            UserPublic.model_validate(user).model_dump()
+            for user in (users[2], users[0])
+        ],
+        "missing": [missing_id],
+    }
+    assert sum(" IN (" in statement for statement in statements) == 1
+
+
+@pytest.mark.parametrize("oversized", [False, True])
+def test_lookup_users_rejects_empty_or_oversized_batches(
+    client: TestClient, token: Token, settings, oversized: bool
+):
+    size = settings.USER_LOOKUP_MAX_IDS + 1 if oversized else 0
+    response = client.post(
+        "/users/lookup",
+        json={"ids": list(range(1, size + 1))},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_get_many_returns_models(session, users):
+    repository = UserRepository(session)
+
+    found = await repository.get_many([users[1].id, users[0].id, 0])
+
+    assert {user.id for user in found} == {users[0].id, users[1].id}
+    assert await repository.get_many([]) == []